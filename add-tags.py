@@ -11,9 +11,10 @@ This will update the post's frontmatter to include the specified tags.
 
 import os
 import sys
-import re
 import argparse
 
+from blog_cli.utils.frontmatter import parse_post, update_frontmatter
+
 def main():
     # Setup argument parser
     parser = argparse.ArgumentParser(description='Add tags to a blog post')
@@ -47,50 +48,15 @@ def main():
     tags = [tag.strip() for tag in tags_string.split(',')]
     
     # Check if the file has frontmatter
-    front_matter_match = re.search(r'^---\s+([\s\S]*?)\s+---', content)
-    
-    if not front_matter_match:
+    post = parse_post(content)
+    if not post.has_frontmatter:
         print('No frontmatter found in the post.')
         print('Make sure the post has a frontmatter section at the top.')
         sys.exit(1)
     
-    # Extract the frontmatter
-    front_matter = front_matter_match.group(1)
-    
-    # Check if the frontmatter already has tags
-    tags_match = re.search(r'tags:\s*\[(.*?)\]', front_matter)
-    tags_list_match = re.search(r'tags:\s*\n([\s\S]*?)(?:\n\w|$)', front_matter)
-    
-    updated_front_matter = None
-    
-    if tags_match:
-        # Update existing tags in array format
-        existing_tags = [tag.strip().strip('"\'') for tag in tags_match.group(1).split(',')]
-        merged_tags = list(set(existing_tags + tags))  # Remove duplicates
-        updated_front_matter = front_matter.replace(
-            tags_match.group(0), 
-            f'tags: [{", ".join(merged_tags)}]'
-        )
-    elif tags_list_match:
-        # Update existing tags in list format
-        existing_tags = []
-        for line in tags_list_match.group(1).split('\n'):
-            match = re.search(r'[-*]\s*(.*)', line)
-            if match:
-                existing_tags.append(match.group(1).strip())
-        
-        merged_tags = list(set(existing_tags + tags))  # Remove duplicates
-        tags_list = '\n'.join([f'- {tag}' for tag in merged_tags])
-        updated_front_matter = front_matter.replace(
-            tags_list_match.group(0), 
-            f'tags:\n{tags_list}\n'
-        )
-    else:
-        # Add new tags field
-        updated_front_matter = f'{front_matter}\ntags: [{", ".join(tags)}]'
-    
-    # Replace the frontmatter in the content
-    updated_content = content.replace(front_matter_match.group(1), updated_front_matter)
+    # Merge with the existing tags (either format), dropping duplicates
+    merged_tags = list(dict.fromkeys(post.tags + tags))
+    updated_content = update_frontmatter(content, {'tags': merged_tags})
     
     # Write the updated content back to the file
     with open(post_path, 'w') as f:
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the build pipeline on seeded synthetic corpora.
+
+Each corpus size is generated in a temporary site (posts with realistic
+frontmatter, code blocks, images and some notebook-sized bodies, plus
+matching notebooks) and benchmarked in a fresh process, timing each phase
+separately:
+
+    parse      read_post_header over every post (post generate-index)
+    render     markdown + code highlighting of every post body
+    index      index entries, sorting and writing post-index.json and shards
+    feed       rss.xml and its archive
+    images     publishing posts/images to the image store
+    notebooks  converting the notebooks to posts
+    build      a full generate_html_posts run, cold and then with nothing changed
+
+Results (seconds, posts/s and peak RSS after each phase) are printed and
+written as JSON so runs can be compared. Everything runs offline.
+
+Usage:
+    python benchmarks/bench_build.py [--sizes 100,1000,10000] [--seed S] [--output results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import base64
+import random
+import shutil
+import struct
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Files of the real site the build needs besides the posts
+SITE_FILES = ['templates/post.html', 'templates/tag.html', 'components/header.html', 'components/footer.html']
+
+WORDS = [
+    'agent', 'reward', 'policy', 'network', 'gradient', 'state', 'action', 'value', 'episode', 'loss',
+    'model', 'safety', 'evaluation', 'prompt', 'benchmark', 'training', 'dataset', 'inference',
+]
+TAGS = ['rl', 'dqn', 'llm', 'safety', 'evaluation', 'python', 'notebook', 'research', 'ppo', 'vision']
+
+# One post in NOTEBOOK_EVERY has a long, notebook-sized body
+NOTEBOOK_EVERY = 10
+IMAGE_COUNT = 50
+
+def make_png(width, height, rng):
+    """Encode a small random RGB image as a PNG, without Pillow."""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+    
+    color = bytes(rng.randrange(256) for _ in range(3))
+    rows = b''.join(b'\x00' + color * width for _ in range(height))
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows))
+            + chunk(b'IEND', b''))
+
+def sentence(rng, words=12):
+    """Return a random sentence."""
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+def code_lines(rng, lines):
+    """Return some lines of python."""
+    return '\n'.join(
+        f"{rng.choice(WORDS)}_{i} = {rng.choice(WORDS)}({rng.randint(0, 99)}, lr={rng.random():.4f})"
+        for i in range(lines)
+    )
+
+def code_block(rng, lines):
+    """Return a fenced python code block."""
+    return f"```python\n{code_lines(rng, lines)}\n```"
+
+def make_post(i, rng):
+    """Generate the markdown of one synthetic post."""
+    tags = rng.sample(TAGS, rng.randint(1, 4))
+    blocks = [sentence(rng, 30)]
+    sections = 12 if i % NOTEBOOK_EVERY == 0 else 3
+    for section in range(sections):
+        blocks.append(f"## Section {section}")
+        blocks.extend(sentence(rng, rng.randint(20, 60)) for _ in range(3))
+        blocks.append(code_block(rng, rng.randint(5, 30)))
+        blocks.append(f"![figure {section}](/posts/images/figure-{rng.randrange(IMAGE_COUNT)}.png)")
+        if i % NOTEBOOK_EVERY == 0:
+            # Notebook exports carry long cell outputs
+            blocks.append('```\n' + '\n'.join(
+                f"epoch {step} loss {rng.random():.5f} reward {rng.random() * 200:.2f}" for step in range(150)
+            ) + '\n```')
+    return (
+        '---\n'
+        f'title: Synthetic post {i}\n'
+        f'date: {rng.choice(["January", "June", "December"])} {rng.randint(1, 28)}, {rng.randint(2015, 2025)}\n'
+        f'categories: [{rng.choice(TAGS)}]\n'
+        f'tags: [{", ".join(tags)}]\n'
+        f'image: images/figure-{rng.randrange(IMAGE_COUNT)}.png\n'
+        '---\n\n'
+        + '\n\n'.join(blocks) + '\n'
+    )
+
+def make_notebook(i, rng):
+    """Generate one synthetic notebook with text, code and image outputs."""
+    png = make_png(64, 48, rng)
+    cells = [{'cell_type': 'markdown', 'source': [f"# Synthetic notebook {i}\n", "\n", sentence(rng, 30)]}]
+    for cell in range(20):
+        cells.append({'cell_type': 'markdown', 'source': sentence(rng, 40)})
+        outputs = [{'output_type': 'stream', 'name': 'stdout', 'text': [
+            f"step {step} loss {rng.random():.5f}\n" for step in range(rng.randint(5, 200))
+        ]}]
+        if cell % 5 == 0:
+            outputs.append({'output_type': 'display_data', 'data': {
+                'image/png': base64.b64encode(png).decode('ascii'), 'text/plain': '<Figure>'}})
+        cells.append({'cell_type': 'code', 'source': code_lines(rng, 10), 'outputs': outputs})
+    return {'cells': cells, 'metadata': {'kernelspec': {'language': 'python'}}, 'nbformat': 4, 'nbformat_minor': 5}
+
+def make_corpus(site, posts, seed):
+    """Generate a synthetic site with the given number of posts."""
+    rng = random.Random(seed)
+    for path in SITE_FILES:
+        os.makedirs(os.path.join(site, os.path.dirname(path)), exist_ok=True)
+        shutil.copy(os.path.join(ROOT, path), os.path.join(site, path))
+    
+    os.makedirs(os.path.join(site, 'posts', 'images'))
+    for i in range(IMAGE_COUNT):
+        with open(os.path.join(site, 'posts', 'images', f'figure-{i}.png'), 'wb') as f:
+            f.write(make_png(rng.randint(200, 1600), rng.randint(100, 900), rng))
+    for i in range(posts):
+        with open(os.path.join(site, 'posts', f'post-{i:05d}.md'), 'w', encoding='utf-8') as f:
+            f.write(make_post(i, rng))
+    
+    os.makedirs(os.path.join(site, 'notebooks'))
+    for i in range(max(1, posts // NOTEBOOK_EVERY)):
+        with open(os.path.join(site, 'notebooks', f'2024-01-01-notebook-{i:04d}.ipynb'), 'w', encoding='utf-8') as f:
+            json.dump(make_notebook(i, rng), f)
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process so far, in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run_phases(site, posts):
+    """Benchmark every phase in a generated site, returning the results by phase."""
+    # Imported here so the generator above does not depend on the package
+    from blog_cli.utils.build import generate_html_posts, render_post
+    from blog_cli.utils.feed import build_feed
+    from blog_cli.utils.frontmatter import read_post_header
+    from blog_cli.utils.images import sync_images
+    from blog_cli.utils.index import make_index_entry, sort_posts, write_index
+    from blog_cli.utils.manifest import CACHE_DIR, BuildManifest
+    from blog_cli.utils.notebook import convert_notebook_file
+    
+    os.chdir(site)
+    paths = sorted(os.path.join('posts', name) for name in os.listdir('posts') if name.endswith('.md'))
+    notebooks = sorted(os.path.join('notebooks', name) for name in os.listdir('notebooks'))
+    state = {}
+    
+    def parse():
+        state['headers'] = [(read_post_header(path), path) for path in paths]
+    
+    def render():
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                render_post(f.read(), os.path.basename(path)[:-3])
+    
+    def index():
+        entries = [make_index_entry(post, os.path.basename(path)[:-3], excerpt)
+                   for (post, excerpt), path in state['headers']]
+        sort_posts(entries)
+        write_index(entries)
+        state['entries'] = entries
+    
+    def feed():
+        build_feed(state['entries'])
+    
+    def images():
+        sync_images(BuildManifest(os.path.join('.bench', 'images.json')), os.path.join('posts', 'images'),
+                    echo=lambda message: None)
+    
+    def convert_notebooks():
+        os.makedirs(os.path.join('converted', 'posts'), exist_ok=True)
+        for path in notebooks:
+            convert_notebook_file(path, os.path.join('converted', 'posts'))
+    
+    def build_cold():
+        # Start without the manifest and the highlight cache the phases above filled
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        generate_html_posts(echo=lambda message: None)
+    
+    def build_warm():
+        generate_html_posts(echo=lambda message: None)
+    
+    phases = [
+        ('parse', parse, posts), ('render', render, posts), ('index', index, posts), ('feed', feed, posts),
+        ('images', images, posts), ('notebooks', convert_notebooks, len(notebooks)),
+        ('build_cold', build_cold, posts), ('build_warm', build_warm, posts),
+    ]
+    results = {}
+    for name, func, items in phases:
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        func()
+        seconds = time.perf_counter() - start
+        results[name] = {
+            'seconds': round(seconds, 4),
+            'cpu_seconds': round(time.process_time() - cpu_start, 4),
+            'items': items,
+            'items_per_s': round(items / seconds, 1) if seconds else None,
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        }
+    return results
+
+def bench_size(posts, seed, keep):
+    """Generate a corpus and benchmark it in this process."""
+    site = tempfile.mkdtemp(prefix=f'blog-bench-{posts}-')
+    try:
+        start = time.perf_counter()
+        make_corpus(site, posts, seed)
+        generated = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(dirpath, name))
+                   for dirpath, _, names in os.walk(site) for name in names)
+        phases = run_phases(site, posts)
+    finally:
+        os.chdir(ROOT)
+        if keep:
+            print(f"Kept {site}", file=sys.stderr)
+        else:
+            shutil.rmtree(site, ignore_errors=True)
+    return {'posts': posts, 'corpus_mb': round(size / 2 ** 20, 1),
+            'generate_seconds': round(generated, 2), 'phases': phases}
+
+def print_results(result):
+    """Print one corpus size's results as a table."""
+    print(f"\n{result['posts']} posts ({result['corpus_mb']} MB corpus)")
+    print(f"{'phase':<12} {'seconds':>9} {'cpu':>9} {'items/s':>10} {'peak RSS':>10}")
+    for name, phase in result['phases'].items():
+        print(f"{name:<12} {phase['seconds']:9.3f} {phase['cpu_seconds']:9.3f} "
+              f"{phase['items_per_s'] or 0:10.1f} {phase['peak_rss_mb']:8.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the build pipeline on synthetic corpora')
+    parser.add_argument('--sizes', default='100,1000,10000', help='Comma-separated corpus sizes (number of posts)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the corpus generator')
+    parser.add_argument('--output', default='bench-results.json', help='JSON file the results are written to')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated sites (their paths are printed)')
+    parser.add_argument('--single', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    # Each size runs in a fresh process so its peak RSS is its own
+    if args.single is not None:
+        json.dump(bench_size(args.single, args.seed, args.keep), sys.stdout)
+        return 0
+    
+    results = []
+    for posts in [int(size) for size in args.sizes.split(',')]:
+        command = [sys.executable, os.path.abspath(__file__), '--single', str(posts), '--seed', str(args.seed)]
+        if args.keep:
+            command.append('--keep')
+        output = subprocess.run(command, stdout=subprocess.PIPE, check=True).stdout
+        result = json.loads(output)
+        print_results(result)
+        results.append(result)
+    
+    report = {
+        'seed': args.seed,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark comparing the single-pass frontmatter parser with the
+regex chain it replaced.
+
+Usage:
+    python benchmarks/bench_frontmatter.py [--posts N] [--body-kb KB] [--repeat R]
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blog_cli.utils.frontmatter import parse_post
+
+def legacy_extract_frontmatter(content):
+    """The regex chain previously used by generate_html_posts.py (kept as the baseline)."""
+    frontmatter_match = re.match(r'^---\s+([\s\S]*?)\s+---', content)
+    if not frontmatter_match:
+        return {}, content
+    
+    frontmatter = frontmatter_match[1]
+    
+    title_match = re.search(r'title:\s*(.+)', frontmatter)
+    title = title_match.group(1).strip() if title_match else ""
+    
+    date_match = re.search(r'date:\s*(.+)', frontmatter)
+    date = date_match.group(1).strip() if date_match else ""
+    
+    tags = []
+    tags_match = re.search(r'tags:\s*\[(.*?)\]', frontmatter)
+    if tags_match:
+        tags = [tag.strip().replace('"', '').replace("'", "") for tag in tags_match.group(1).split(',')]
+    else:
+        tags_list_match = re.search(r'tags:\s*\n([\s\S]*?)(?:\n\w|$)', frontmatter)
+        if tags_list_match:
+            tags = [re.match(r'[-*]\s*(.*)', line).group(1).strip()
+                   for line in tags_list_match.group(1).split('\n')
+                   if re.match(r'[-*]\s*(.*)', line)]
+    
+    categories = []
+    cat_match = re.search(r'categories:\s*\[(.*?)\]', frontmatter)
+    if cat_match:
+        categories = [cat.strip().replace('"', '').replace("'", "") for cat in cat_match.group(1).split(',')]
+    
+    image_match = re.search(r'image:\s*(.+)', frontmatter)
+    image = image_match.group(1).strip() if image_match else None
+    
+    content_without_frontmatter = re.sub(r'^---\s+[\s\S]*?---\s+', '', content)
+    
+    return {
+        'title': title,
+        'date': date,
+        'tags': tags,
+        'categories': categories,
+        'image': image
+    }, content_without_frontmatter
+
+def make_corpus(posts, body_kb, seed=0):
+    """Generate a seeded list of synthetic posts."""
+    rng = random.Random(seed)
+    words = ['agent', 'reward', 'policy', 'network', 'gradient', 'state', 'action', 'value', 'episode', 'loss']
+    paragraph = ' '.join(rng.choice(words) for _ in range(120)) + '\n\n'
+    body = (paragraph * (body_kb * 1024 // len(paragraph) + 1))[:body_kb * 1024]
+    corpus = []
+    for i in range(posts):
+        if i % 2:
+            tags = 'tags: [%s]\n' % ', '.join(rng.sample(words, 3))
+        else:
+            tags = 'tags:\n' + ''.join('- %s\n' % tag for tag in rng.sample(words, 3))
+        corpus.append(
+            '---\n'
+            f'title: Synthetic post {i}\n'
+            f'date: {rng.choice(["January", "June", "December"])} {rng.randint(1, 28)}, {rng.randint(2015, 2025)}\n'
+            f'categories: [{rng.choice(words)}, {rng.choice(words)}]\n'
+            f'{tags}'
+            f'image: images/post-{i}.png\n'
+            '---\n\n'
+            f'# Synthetic post {i}\n\n'
+            + body
+        )
+    return corpus
+
+def bench(label, func, corpus, repeat):
+    """Time func over the corpus, returning the best of ``repeat`` runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in corpus:
+            func(content)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<12} {best * 1000:9.1f} ms  {len(corpus) / best:12.0f} posts/s")
+    return best
+
+def single_pass(content):
+    """Parse with the shared parser and slice off the body, as the build does."""
+    post = parse_post(content)
+    return post, post.body(content)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark frontmatter parsing')
+    parser.add_argument('--posts', type=int, default=5000, help='Number of synthetic posts')
+    parser.add_argument('--body-kb', type=int, default=20, help='Body size of each post in KB')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timed runs (best is reported)')
+    args = parser.parse_args()
+    
+    corpus = make_corpus(args.posts, args.body_kb)
+    
+    # Sanity check: both parsers agree on the synthetic corpus
+    for content in corpus[:50]:
+        metadata, body = legacy_extract_frontmatter(content)
+        post, new_body = single_pass(content)
+        assert post.to_dict() == {key: metadata[key] for key in post.to_dict()}, content[:200]
+        assert new_body == body
+    
+    print(f"{args.posts} posts, {args.body_kb} KB bodies")
+    legacy = bench('regex chain', legacy_extract_frontmatter, corpus, args.repeat)
+    current = bench('single pass', single_pass, corpus, args.repeat)
+    print(f"speedup      {legacy / current:9.1f}x")
+
+if __name__ == "__main__":
+    main()
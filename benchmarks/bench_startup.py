@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the blog-cli entry point.
+
+Times fresh interpreter runs of a few cheap invocations against a bare
+interpreter, and checks that they do not import any command module or heavy
+dependency. Exits with status 1 if a heavy module is imported or the median
+overhead of `blog-cli --version` is over budget, so it can guard the startup
+time in CI or a pre-commit hook.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat R] [--budget-ms MS]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Invocations that should never pay for the command modules
+INVOCATIONS = [
+    ['--version'],
+    ['--help'],
+]
+
+# Modules that must stay unloaded until a command that needs them runs
+HEAVY_MODULES = ('blog_cli.commands', 'blog_cli.utils', 'markdown', 'pygments', 'PIL')
+
+def run_times(command, repeat):
+    """Run a command ``repeat`` times in fresh processes, returning the wall times in ms."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+def imported_modules(args):
+    """Return the modules imported by a blog-cli invocation, from python -X importtime."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'blog_cli.cli'] + args,
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            name = line.rsplit('|', 1)[1].strip()
+            if name != 'package':
+                modules.append(name)
+    return modules
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark blog-cli startup time')
+    parser.add_argument('--repeat', type=int, default=20, help='Number of runs per invocation')
+    parser.add_argument('--budget-ms', type=float, default=100.0,
+                        help='Maximum median overhead of `blog-cli --version` over a bare interpreter')
+    args = parser.parse_args()
+    
+    failed = False
+    baseline = statistics.median(run_times([sys.executable, '-c', 'pass'], args.repeat))
+    print(f"{'python -c pass':<24} {baseline:8.1f} ms")
+    
+    overheads = {}
+    for invocation in INVOCATIONS:
+        label = 'blog-cli ' + ' '.join(invocation)
+        median = statistics.median(run_times([sys.executable, '-m', 'blog_cli.cli'] + invocation, args.repeat))
+        overheads[label] = median - baseline
+        print(f"{label:<24} {median:8.1f} ms  (+{median - baseline:.1f} ms)")
+        
+        heavy = [name for name in imported_modules(invocation) if name.startswith(HEAVY_MODULES)]
+        if heavy:
+            print(f"  imports {', '.join(sorted(set(heavy)))}")
+            failed = True
+    
+    if overheads['blog-cli --version'] > args.budget_ms:
+        print(f"Startup overhead over budget: {overheads['blog-cli --version']:.1f} ms > {args.budget_ms:.1f} ms")
+        failed = True
+    
+    print('FAILED' if failed else 'OK')
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
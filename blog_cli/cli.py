@@ -3,24 +3,56 @@
 Main entry point for the blog CLI tool
 """
 
+import importlib
+
 import click
 from blog_cli import __version__
 
-@click.group()
+# Subcommands, the "module:attribute" they live in and their summary for
+# --help. A command's module (and everything it imports: markdown, pygments,
+# Pillow, ...) is only loaded when that command runs, so `blog-cli --version`
+# and `blog-cli --help` start instantly.
+COMMANDS = {
+    'post': ('blog_cli.commands.post:post', 'Commands for managing blog posts'),
+    'page': ('blog_cli.commands.page:page', 'Commands for managing static pages'),
+    'notebook': ('blog_cli.commands.notebook:notebook', 'Commands for working with Jupyter notebooks'),
+    'build': ('blog_cli.commands.build:build', 'Render markdown posts to HTML and update the post index'),
+    'serve': ('blog_cli.commands.serve:serve', 'Serve the site locally with live reload'),
+    'feed': ('blog_cli.commands.feed:feed', 'Commands for managing the RSS feed'),
+}
+
+class LazyGroup(click.Group):
+    """Click group that imports each subcommand on first use."""
+
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = dict(lazy_commands or {})
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            module_name, attribute = self.lazy_commands[cmd_name][0].split(':')
+            self.add_command(getattr(importlib.import_module(module_name), attribute), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        # List the commands from their registered summaries instead of importing them
+        rows = [
+            (name, self.lazy_commands[name][1] if name in self.lazy_commands
+             else self.commands[name].get_short_help_str())
+            for name in self.list_commands(ctx)
+        ]
+        if rows:
+            with formatter.section('Commands'):
+                formatter.write_dl(rows)
+
+@click.group(cls=LazyGroup, lazy_commands=COMMANDS)
 @click.version_option(version=__version__)
 def cli():
     """Blog CLI - A command-line tool for managing static blog content"""
     pass
 
-# Import command groups
-from blog_cli.commands.post import post
-from blog_cli.commands.page import page
-from blog_cli.commands.notebook import notebook
-
-# Add command groups to the CLI
-cli.add_command(post)
-cli.add_command(page)
-cli.add_command(notebook)
-
 if __name__ == "__main__":
-    cli() 
\ No newline at end of file
+    cli()
@@ -0,0 +1,44 @@
+"""
+Build command for the blog CLI
+"""
+
+import time
+
+import click
+
+from blog_cli.utils.build import generate_html_posts
+from blog_cli.utils.profile import TRACE_FILE, Profiler
+from blog_cli.utils.watch import WATCH_DIRS, watch as watch_dirs
+
+@click.command()
+@click.option('--jobs', '-j', default=1, show_default=True,
+              help='Number of worker processes to render posts with (0 = all cores)')
+@click.option('--force', is_flag=True, help='Re-render every post, ignoring the build manifest')
+@click.option('--watch', is_flag=True, help='Keep running and rebuild whenever sources change')
+@click.option('--profile', is_flag=True,
+              help=f"Time each phase and post, writing a trace to {TRACE_FILE} and listing the slowest posts")
+def build(jobs, force, watch, profile):
+    """Render markdown posts to HTML and update the post index"""
+    with Profiler(enabled=profile) as profiler:
+        generate_html_posts(force=force, jobs=jobs, echo=click.echo, profiler=profiler)
+    profiler.report(click.echo)
+    
+    if watch:
+        click.echo(f"Watching {', '.join(WATCH_DIRS)} for changes (press Ctrl+C to stop)")
+        try:
+            watch_dirs(WATCH_DIRS, lambda changed: rebuild(changed, jobs))
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+def rebuild(changed, jobs=1):
+    """Incrementally rebuild after a burst of changes, reporting (not raising) errors"""
+    click.echo(f"Changed: {', '.join(changed)}")
+    start = time.perf_counter()
+    try:
+        generate_html_posts(jobs=jobs, echo=click.echo)
+    except Exception as e:
+        click.echo(f"Build failed: {e}", err=True)
+        return False
+    click.echo(f"Rebuilt in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return True
@@ -0,0 +1,37 @@
+"""
+Feed-related commands for the blog CLI
+"""
+
+import os
+import json
+
+import click
+
+from blog_cli.utils.feed import FEED_FILE, FEED_SIZE, build_feed
+from blog_cli.utils.index import INDEX_FILE
+
+# Command group for feed-related commands
+@click.group()
+def feed():
+    """Commands for managing the RSS feed"""
+    pass
+
+@feed.command('build')
+@click.option('--limit', '-n', default=FEED_SIZE, show_default=True,
+              help='Number of items in rss.xml; older items go to the archive feed')
+def build_command(limit):
+    """Generate rss.xml from post-index.json and the hand-curated items"""
+    if not os.path.exists(INDEX_FILE):
+        click.echo(f"{INDEX_FILE} not found; run 'blog-cli build' first", err=True)
+        return 1
+    
+    with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+        posts = json.load(f)
+    
+    changed = build_feed(posts, feed_size=limit)
+    if changed:
+        for path in changed:
+            click.echo(f"Updated {path}" if os.path.exists(path) else f"Removed {path}")
+    else:
+        click.echo(f"{FEED_FILE} unchanged")
+    return 0
@@ -4,15 +4,27 @@ Notebook-related commands for the blog CLI
 
 import os
 import re
+import sys
 import json
 import shutil
+import time
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from datetime import datetime
 
 import click
 
 from blog_cli.utils.frontmatter import update_frontmatter
+from blog_cli.utils.images import extract_data_uris
+from blog_cli.utils.manifest import CACHE_DIR, BuildManifest, hash_bytes
+from blog_cli.utils.notebook import (
+    CONVERTER_VERSION, MAX_OUTPUT_LINES, MAX_POST_OUTPUT, OutputBudget, convert_notebook_file,
+    extract_notebook_metadata, image_saver, known_images, notebook_to_post, post_filename
+)
+from blog_cli.utils.profile import TRACE_FILE, Profiler
+
+# Records the source hash of each notebook converted by convert-all
+NOTEBOOK_MANIFEST = 'notebooks.json'
 
 # Command group for notebook-related commands
 @click.group()
@@ -23,7 +35,15 @@ def notebook():
 @notebook.command()
 @click.argument('notebook_path')
 @click.option('--output', help='Output filename (optional)')
-def convert(notebook_path, output):
+@click.option('--engine', type=click.Choice(['native', 'nbconvert']), default='native', show_default=True,
+              help='Convert in-process, or with a jupyter nbconvert subprocess')
+@click.option('--max-output-lines', default=MAX_OUTPUT_LINES, show_default=True,
+              help='Collapse longer text outputs to their first and last lines (0 = no limit)')
+@click.option('--max-post-output', default=MAX_POST_OUTPUT, show_default=True,
+              help='Characters of output shown per post before outputs are only linked (0 = no limit)')
+@click.option('--profile', is_flag=True,
+              help=f"Time each phase and cell, writing a trace to {TRACE_FILE} and listing the slowest cells")
+def convert(notebook_path, output, engine, max_output_lines, max_post_output, profile):
     """Convert a Jupyter notebook to a Markdown blog post"""
     notebook_path = Path(notebook_path)
     
@@ -37,22 +57,174 @@ def convert(notebook_path, output):
         click.echo(f"File is not a Jupyter notebook: {notebook_path}", err=True)
         return 1
     
-    try:
-        # Check if jupyter is installed
-        subprocess.run(['jupyter', '--version'], check=True, capture_output=True)
-    except (subprocess.SubprocessError, FileNotFoundError):
-        click.echo("Jupyter is not installed or not in PATH. Please install it with: pip install jupyter", err=True)
+    # Create posts directory if it doesn't exist
+    posts_dir = Path.cwd() / 'posts'
+    posts_dir.mkdir(exist_ok=True)
+    
+    click.echo(f"Converting notebook to markdown...")
+    with Profiler(enabled=profile, name='notebook convert') as profiler:
+        if engine == 'nbconvert':
+            post_path = nbconvert_to_post(notebook_path, posts_dir, output, profiler)
+        else:
+            # Output images are decoded straight into posts/images under content-hash names,
+            # and the full text of shortened outputs is stored in assets/logs
+            post_path = convert_notebook_file(str(notebook_path), str(posts_dir), output,
+                                              OutputBudget(max_output_lines, max_post_output), profiler,
+                                              known_images(str(posts_dir)))
+    if post_path is None:
         return 1
     
+    click.echo(f"Created blog post: {post_path}")
+    profiler.report(click.echo, category='cell')
+    return 0
+
+def nbconvert_to_post(notebook_path, posts_dir, output, profiler):
+    """Convert a notebook to a post with jupyter nbconvert, returning its path (None on failure)"""
+    profiler.phase('load')
     # Extract metadata from the notebook
-    with open(notebook_path, 'r') as f:
+    with open(notebook_path, 'r', encoding='utf-8') as f:
         notebook_json = json.load(f)
     
     metadata = extract_notebook_metadata(notebook_json, notebook_path.name)
     
+    profiler.phase('convert')
+    content = run_nbconvert(notebook_path)
+    if content is None:
+        return None
+    content = handle_notebook_images(notebook_path, content, posts_dir)
+    # HTML outputs can still embed images as data URIs
+    content, extracted = extract_data_uris(content, image_saver(str(posts_dir), known_images(str(posts_dir))))
+    if extracted:
+        click.echo(f"Extracted {extracted} inline images to {posts_dir / 'images'}")
+    
+    # Add frontmatter to content
+    content = update_frontmatter(content, metadata)
+    
+    # Save to posts directory (the only write of the post)
+    profiler.phase('write')
+    post_path = posts_dir / post_filename(notebook_path.name, metadata['title'], output)
+    with open(post_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return post_path
+
+@notebook.command('convert-all')
+@click.argument('directory')
+@click.option('--jobs', '-j', default=0, show_default=True,
+              help='Number of worker processes (0 = all cores)')
+@click.option('--force', is_flag=True, help='Convert notebooks even if they are unchanged since their last conversion')
+@click.option('--max-output-lines', default=MAX_OUTPUT_LINES, show_default=True,
+              help='Collapse longer text outputs to their first and last lines (0 = no limit)')
+@click.option('--max-post-output', default=MAX_POST_OUTPUT, show_default=True,
+              help='Characters of output shown per post before outputs are only linked (0 = no limit)')
+def convert_all(directory, jobs, force, max_output_lines, max_post_output):
+    """Convert every Jupyter notebook under a directory to blog posts"""
+    directory = Path(directory)
+    if not directory.is_dir():
+        click.echo(f"Directory not found: {directory}", err=True)
+        sys.exit(1)
+    
+    notebooks = sorted(
+        path for path in directory.rglob('*.ipynb') if '.ipynb_checkpoints' not in path.parts
+    )
+    if not notebooks:
+        click.echo(f"No notebooks found in {directory}")
+        return 0
+    
+    posts_dir = Path.cwd() / 'posts'
+    posts_dir.mkdir(exist_ok=True)
+    
+    # Each conversion is recorded as soon as its post is written, so an interrupted
+    # import resumes where it stopped
+    limits = (max_output_lines, max_post_output)
+    options = {'converter': CONVERTER_VERSION, 'budget': OutputBudget(*limits).options()}
+    manifest = BuildManifest.load(os.path.join(CACHE_DIR, NOTEBOOK_MANIFEST), options)
+    
+    tasks = []
+    skipped = 0
+    for path in notebooks:
+        source = str(path)
+        st = path.stat()
+        if not force and manifest.is_fresh(manifest.lookup(source, st)):
+            skipped += 1
+            continue
+        digest = hash_bytes(path.read_bytes())
+        if not force and manifest.is_fresh(manifest.entries.get(source), digest):
+            manifest.touch(source, st)
+            skipped += 1
+            continue
+        tasks.append((source, st, digest))
+    
+    click.echo(f"Converting {len(tasks)} notebooks ({skipped} unchanged)...")
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    
+    # Workers convert and return the post; the parent writes it. Notebooks that
+    # map to the same post (same date and title in different directories) would
+    # overwrite each other, so the first one keeps the post, including an
+    # unchanged notebook that already wrote it. Results are taken in notebook
+    # order so the same notebook wins every time.
+    start = time.perf_counter()
+    failures = []
+    pending = {source for source, _, _ in tasks}
+    existing = {str(path) for path in notebooks}
+    claimed = {
+        entry['output']: source for source, entry in manifest.entries.items()
+        if source in existing and source not in pending
+    }
+    
+    # Images already in posts/images are hashed once here, not by every worker
+    images = known_images(str(posts_dir))
+    with ProcessPoolExecutor(max_workers=max(1, min(jobs, len(tasks)))) as executor:
+        futures = [
+            (executor.submit(timed_convert, source, str(posts_dir), limits, images), source, st, digest)
+            for source, st, digest in tasks
+        ]
+        for future, source, st, digest in futures:
+            try:
+                filename, content, seconds = future.result()
+            except Exception as e:
+                failures.append(source)
+                click.echo(f"  FAILED   {source}: {e}", err=True)
+                continue
+            post_path = str(posts_dir / filename)
+            if post_path in claimed:
+                failures.append(source)
+                click.echo(f"  FAILED   {source}: converts to the same post as {claimed[post_path]} ({post_path})",
+                           err=True)
+                continue
+            claimed[post_path] = source
+            with open(post_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            manifest.record(source, st, digest, post_path)
+            manifest.save()
+            click.echo(f"  {seconds * 1000:6.0f} ms  {source} -> {post_path}")
+    
+    manifest.save()
+    elapsed = time.perf_counter() - start
+    click.echo(f"Converted {len(tasks) - len(failures)} notebooks in {elapsed:.1f}s "
+               f"({skipped} unchanged, {len(failures)} failed)")
+    # A click command's return value is not its exit status
+    if failures:
+        sys.exit(1)
+    return 0
+
+def timed_convert(notebook_path, posts_dir, limits, images=None):
+    """Convert one notebook in a worker process, returning the post filename and content and the time taken"""
+    start = time.perf_counter()
+    filename, content = notebook_to_post(notebook_path, posts_dir, budget=OutputBudget(*limits), existing=images)
+    return filename, content, time.perf_counter() - start
+
+def run_nbconvert(notebook_path):
+    """Convert a notebook with a jupyter nbconvert subprocess, returning the markdown (None on failure)"""
+    try:
+        # Check if jupyter is installed
+        subprocess.run(['jupyter', '--version'], check=True, capture_output=True)
+    except (subprocess.SubprocessError, FileNotFoundError):
+        click.echo("Jupyter is not installed or not in PATH. Please install it with: pip install jupyter", err=True)
+        return None
+    
     # Convert the notebook to markdown using nbconvert
     temp_output = f"{notebook_path.stem}_temp.md"
-    click.echo(f"Converting notebook to markdown...")
     
     try:
         subprocess.run(
@@ -62,7 +234,7 @@ def convert(notebook_path, output):
         )
     except subprocess.SubprocessError as e:
         click.echo(f"Error converting notebook: {e}", err=True)
-        return 1
+        return None
     
     # Get the full path to the converted file (nbconvert adds .md extension)
     temp_md_path = notebook_path.parent / f"{temp_output}.md"
@@ -71,108 +243,22 @@ def convert(notebook_path, output):
     
     if not temp_md_path.exists():
         click.echo(f"Converted markdown file not found", err=True)
-        return 1
+        return None
     
     # Read the converted markdown
     with open(temp_md_path, 'r') as f:
         content = f.read()
     
-    # Add frontmatter to content
-    content = update_frontmatter(content, metadata)
-    
-    # Create posts directory if it doesn't exist
-    posts_dir = Path.cwd() / 'posts'
-    posts_dir.mkdir(exist_ok=True)
-    
-    # Create the output filename
-    if output:
-        post_filename = output if output.endswith('.md') else f"{output}.md"
-    else:
-        # Extract date from original filename or use today's date
-        date_match = re.match(r'(\d{4}-\d{2}-\d{2})', notebook_path.name)
-        date_prefix = date_match.group(1) if date_match else datetime.now().strftime('%Y-%m-%d')
-        
-        # Create slug from title
-        slug = re.sub(r'[^a-z0-9]+', '-', metadata['title'].lower())
-        slug = re.sub(r'(^-|-$)', '', slug)
-        
-        post_filename = f"{date_prefix}-{slug}.md"
-    
-    # Save to posts directory
-    post_path = posts_dir / post_filename
-    with open(post_path, 'w') as f:
-        f.write(content)
-    
     # Remove the temporary markdown file
     temp_md_path.unlink()
-    
-    click.echo(f"Created blog post: {post_path}")
-    
-    # Handle images
-    handle_notebook_images(notebook_path, post_path, posts_dir)
-    
-    return 0
-
-def extract_notebook_metadata(notebook_json, notebook_filename):
-    """Extract metadata from notebook cells."""
-    title = ""
-    categories = []
-    image = None
-    date = None
-    
-    # Try to extract date from filename (format: YYYY-MM-DD-title.ipynb)
-    date_match = re.match(r'(\d{4}-\d{2}-\d{2})', notebook_filename)
-    if date_match:
-        date_str = date_match.group(1)
-        try:
-            date = datetime.strptime(date_str, '%Y-%m-%d').strftime('%B %d, %Y')
-        except ValueError:
-            pass
-    
-    # If no date in filename, use current date
-    if not date:
-        date = datetime.now().strftime('%B %d, %Y')
-    
-    # Look for metadata in the first markdown cell
-    for cell in notebook_json['cells']:
-        if cell['cell_type'] == 'markdown':
-            content = ''.join(cell['source'])
-            
-            # Extract title from first heading
-            title_match = re.search(r'# (.*?)$', content, re.MULTILINE)
-            if title_match and not title:
-                title = title_match.group(1).strip()
-            
-            # Look for fastpages-style metadata
-            categories_match = re.search(r'- categories: \[(.*?)\]', content)
-            if categories_match:
-                categories = [cat.strip() for cat in categories_match.group(1).split(',')]
-            
-            image_match = re.search(r'- image: (.*?)$', content, re.MULTILINE)
-            if image_match:
-                image = image_match.group(1).strip()
-                
-            # If we found all metadata, break
-            if title and categories and image:
-                break
-    
-    # If no title found, use the notebook filename
-    if not title:
-        title = notebook_filename.replace('.ipynb', '').replace('-', ' ').title()
-    
-    return {
-        'title': title,
-        'date': date,
-        'categories': categories,
-        'image': image
-    }
+    return content
 
-def handle_notebook_images(notebook_path, post_path, posts_dir):
-    """Extract and copy images from the notebook"""
+def handle_notebook_images(notebook_path, content, posts_dir):
+    """Copy the images nbconvert extracted from the notebook and point the markdown at them"""
     images_dir = notebook_path.parent / f"{notebook_path.stem}_files"
     
     if not images_dir.exists() or not images_dir.is_dir():
-        return
+        return content
     
     # Make sure the images directory exists in the posts directory
     post_images_dir = posts_dir / 'images'
@@ -185,7 +271,7 @@ def handle_notebook_images(notebook_path, post_path, posts_dir):
         image_files.extend(list(images_dir.glob(f"**/*{ext}")))
     
     if not image_files:
-        return
+        return content
     
     # Copy images to the posts/images directory
     for img_file in image_files:
@@ -193,18 +279,9 @@ def handle_notebook_images(notebook_path, post_path, posts_dir):
         shutil.copy2(img_file, target_path)
         click.echo(f"  Copied: {img_file.name}")
     
-    # Update image paths in the markdown
-    with open(post_path, 'r') as f:
-        content = f.read()
-    
     # Update image paths from relative to /posts/images/
-    content = re.sub(
+    return re.sub(
         r'!\[(.*?)\]\((.*?)_files/(.*?)\)',
         r'![\1](/posts/images/\3)',
         content
     )
-    
-    with open(post_path, 'w') as f:
-        f.write(content)
-    
-    click.echo(f"Updated image paths in the blog post") 
\ No newline at end of file
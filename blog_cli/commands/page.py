@@ -7,6 +7,7 @@ from pathlib import Path
 
 import click
 
+from blog_cli.utils.includes import ComponentCache, expand_includes
 from blog_cli.utils.templates import get_page_template
 
 # Command group for page-related commands
@@ -25,8 +26,11 @@ def create(page_name, title, description, subdirectory):
     # Define the path
     html_file = f"{page_name}.html"
     
-    # Create HTML content
+    # Create HTML content, with the header and footer inlined when the components exist
     html_content = get_page_template(title, description, subdirectory)
+    # Pages meant for a subdirectory use "../components/", so resolve from one level down
+    page_path = os.path.join('subdirectory', html_file) if subdirectory else html_file
+    html_content, _ = expand_includes(html_content, page_path, ComponentCache())
 
     # Write the HTML file
     with open(html_file, 'w') as f:
@@ -4,13 +4,15 @@ Post-related commands for the blog CLI
 
 import os
 import re
-import json
 from pathlib import Path
 from datetime import datetime
 
 import click
 
-from blog_cli.utils.frontmatter import extract_frontmatter, update_frontmatter
+from blog_cli.utils.frontmatter import parse_date, update_frontmatter
+from blog_cli.utils.index import write_index
+from blog_cli.utils.profile import TRACE_FILE, Profiler
+from blog_cli.utils.store import PostStore
 from blog_cli.utils.templates import get_post_template
 
 # Command group for post-related commands
@@ -86,49 +88,83 @@ def add_tags(post_filename, tags):
     return 0
 
 @post.command(name='generate-index')
-def generate_index():
+@click.option('--profile', is_flag=True,
+              help=f"Time each phase and post, writing a trace to {TRACE_FILE} and listing the slowest posts")
+def generate_index(profile):
     """Generate a JSON index of all blog posts"""
-    posts = []
     posts_dir = Path.cwd() / 'posts'
     
     if not posts_dir.exists():
         click.echo(f"Posts directory not found: {posts_dir}", err=True)
         return 1
+    
+    with Profiler(enabled=profile, name='generate-index') as profiler, PostStore() as store:
+        # Only posts whose size or mtime changed since the last run are parsed
+        profiler.phase('sync store')
+        store.sync('posts')
         
-    for filepath in posts_dir.glob('*.md'):
-        filename = filepath.name
-        
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        metadata = extract_frontmatter(content)
-        
-        # Extract excerpt
-        content_without_frontmatter = re.sub(r'^---\s+[\s\S]*?---\s+', '', content)
-        excerpt_match = re.search(r'^(.*?)\n\n', content_without_frontmatter, re.DOTALL)
-        excerpt = excerpt_match.group(1) if excerpt_match else content_without_frontmatter[:150] + '...'
-        excerpt = re.sub(r'^#+\s+.*$', '', excerpt, flags=re.MULTILINE).strip()
+        # Sorted by date (newest first) by the query
+        profiler.phase('query')
+        posts = store.posts()
         
-        posts.append({
-            'filename': filename,
-            'title': metadata.get('title', filename.replace('.md', '').replace('-', ' ')),
-            'date': metadata.get('date', ''),
-            'categories': metadata.get('categories', []),
-            'tags': metadata.get('tags', []),
-            'image': metadata.get('image', ''),
-            'excerpt': excerpt
-        })
-    
-    # Sort posts by date (newest first)
-    try:
-        posts.sort(key=lambda post: datetime.strptime(post['date'], '%B %d, %Y') if post['date'] else datetime.min, reverse=True)
-    except ValueError:
-        # If date format varies, try a simpler sort
-        posts.sort(key=lambda post: post['date'] if post['date'] else '', reverse=True)
-    
-    # Write index to JSON file
-    with open('post-index.json', 'w', encoding='utf-8') as f:
-        json.dump(posts, f, indent=2)
+        # Write index to JSON file, plus the paginated shards readers fetch
+        profiler.phase('write index')
+        write_index(posts)
     
     click.echo(f"Generated index with {len(posts)} posts")
-    return 0 
\ No newline at end of file
+    profiler.report(click.echo)
+    return 0
+
+@post.command(name='list')
+@click.option('--tag', '-t', help='Only list posts with this tag or category')
+@click.option('--limit', '-n', type=int, help='Maximum number of posts to list')
+def list_posts(tag, limit):
+    """List posts, newest first"""
+    posts_dir = Path.cwd() / 'posts'
+    if not posts_dir.exists():
+        click.echo(f"Posts directory not found: {posts_dir}", err=True)
+        return 1
+    
+    # Metadata comes from .blog-cache/posts.sqlite; only changed posts are re-read
+    with PostStore() as store:
+        store.sync('posts')
+        posts = store.posts(tag=tag, limit=limit)
+    
+    for entry in posts:
+        click.echo(format_post(entry))
+    if not posts:
+        click.echo(f"No posts tagged {tag}" if tag else "No posts")
+    return 0
+
+@post.command()
+@click.argument('query', nargs=-1, required=True)
+@click.option('--limit', '-n', default=10, show_default=True, help='Maximum number of results')
+def search(query, limit):
+    """Search posts by title, tags, text, code and output"""
+    posts_dir = Path.cwd() / 'posts'
+    if not posts_dir.exists():
+        click.echo(f"Posts directory not found: {posts_dir}", err=True)
+        return 1
+    
+    # Matches are highlighted on a terminal (click strips the styling otherwise)
+    marks = tuple(click.style('\0', fg='yellow', bold=True).split('\0'))
+    with PostStore() as store:
+        if not store.searchable:
+            click.echo("Search needs SQLite with FTS5, which this Python was built without", err=True)
+            return 1
+        store.sync('posts', search=True)
+        results = store.search(' '.join(query), limit, marks)
+    
+    for entry, snippet in results:
+        click.echo(format_post(entry))
+        click.echo(f"    {snippet}")
+    if not results:
+        click.echo("No matching posts")
+    return 0
+
+def format_post(entry):
+    """Format a post-index.json entry as one line: date, title, tags and source"""
+    date = parse_date(entry['date']) if entry['date'] else None
+    tags = ', '.join(entry['tags'] or entry['categories'])
+    return (f"{date.strftime('%Y-%m-%d') if date else '----------'}  {entry['title']}"
+            + (f"  [{tags}]" if tags else '') + f"  (posts/{entry['filename']}.md)")
@@ -0,0 +1,49 @@
+"""
+Local preview server command for the blog CLI
+"""
+
+import threading
+
+import click
+
+from blog_cli.commands.build import rebuild
+from blog_cli.utils.build import generate_html_posts
+from blog_cli.utils.server import PreviewServer
+from blog_cli.utils.watch import WATCH_DIRS, watch as watch_dirs
+
+@click.command()
+@click.option('--host', default='127.0.0.1', show_default=True, help='Address to listen on')
+@click.option('--port', '-p', default=8000, show_default=True, help='Port to listen on')
+@click.option('--watch/--no-watch', default=True, show_default=True,
+              help='Rebuild when sources change and reload open pages')
+@click.option('--jobs', '-j', default=1, show_default=True,
+              help='Number of worker processes to render posts with (0 = all cores)')
+def serve(host, port, watch, jobs):
+    """Serve the site locally with caching headers, gzip and live reload"""
+    if watch:
+        generate_html_posts(jobs=jobs, echo=click.echo)
+    
+    try:
+        server = PreviewServer((host, port), live_reload=watch)
+    except OSError as e:
+        click.echo(f"Cannot listen on {host}:{port}: {e}", err=True)
+        return 1
+    click.echo(f"Prepared gzip variants of {server.gzip_cache.prebuild()} files")
+    
+    if watch:
+        def on_change(changed):
+            if rebuild(changed, jobs):
+                server.gzip_cache.prebuild()
+                click.echo(f"Reloaded {server.notify_reload()} open pages")
+        
+        threading.Thread(target=watch_dirs, args=(WATCH_DIRS, on_change), daemon=True).start()
+        click.echo(f"Watching {', '.join(WATCH_DIRS)} for changes")
+    
+    click.echo(f"Serving the site at http://{host}:{port}/ (press Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
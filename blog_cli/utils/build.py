@@ -0,0 +1,362 @@
+"""
+Build pipeline that renders markdown posts to static HTML
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import markdown
+
+from blog_cli.utils.feed import build_feed
+from blog_cli.utils.frontmatter import parse_post, extract_excerpt
+from blog_cli.utils.index import make_index_entry, sort_posts, tag_slugs, write_index
+from blog_cli.utils.highlight import HIGHLIGHT_OPTIONS, highlight_code_blocks, write_stylesheet
+from blog_cli.utils.images import (
+    IMAGE_OPTIONS, existing_images, extract_data_uris, published_names, refs_current, rewrite_image_refs,
+    sync_images
+)
+from blog_cli.utils.includes import ComponentCache, expand_includes, expand_site_pages
+from blog_cli.utils.notebook import image_saver
+from blog_cli.utils.profile import Profiler, run_profiled
+from blog_cli.utils.tags import write_tag_pages
+from blog_cli.utils.store import PostStore
+from blog_cli.utils.search import (
+    SEARCH_VERSION, STEM_RULES, STOPWORDS, assign_doc_ids, post_terms, write_search_index
+)
+from blog_cli.utils.pages import (
+    POST_PAGES_DIR, POST_TEMPLATE, post_page_path, post_page_values, prepare_post_template
+)
+from blog_cli.utils.templates import Template, compile_template
+from blog_cli.utils.manifest import (
+    CACHE_DIR, MANIFEST_FILENAME, BuildManifest, hash_bytes
+)
+
+# Code blocks are highlighted after conversion, with a per-block cache
+MARKDOWN_EXTENSIONS = ['fenced_code']
+
+# Anything that changes the rendered output; bumping it invalidates the manifest
+RENDER_OPTIONS = {
+    'markdown': markdown.__version__,
+    'extensions': MARKDOWN_EXTENSIONS,
+    'index_format': 2,
+    'highlight': HIGHLIGHT_OPTIONS,
+    'images': IMAGE_OPTIONS,
+    'search': [SEARCH_VERSION, STEM_RULES, sorted(STOPWORDS)],
+}
+
+def render_post(content, base_filename):
+    """Render a markdown post to HTML and build its index entry."""
+    # Extract frontmatter and content
+    post = parse_post(content)
+    body = post.body(content)
+    
+    # Convert markdown to HTML
+    html_content = highlight_code_blocks(markdown.markdown(body, extensions=MARKDOWN_EXTENSIONS))
+    
+    return html_content, make_index_entry(post, base_filename, extract_excerpt(body))
+
+def write_post_page(page_template: Template, post_data: Dict[str, Any], html_content: str,
+                    slugs: Optional[Dict[str, str]] = None) -> str:
+    """Write the complete page of a post, streaming it from the compiled template, and return its path."""
+    page_path = post_page_path(post_data)
+    os.makedirs(os.path.dirname(page_path), exist_ok=True)
+    with open(page_path, 'w', encoding='utf-8') as f:
+        page_template.stream(f, post_page_values(post_data, html_content, slugs))
+    return page_path
+
+def render_post_file(filepath: str, html_posts_dir: str, page_template: Template, images: Dict[str, Any],
+                     known_hash: Optional[str] = None, slugs: Optional[Dict[str, str]] = None) -> Tuple[str, Optional[Dict[str, Any]], List[str],
+                                                                 Dict[str, Any]]:
+    """
+    Read, hash and (if needed) render a single post, writing its HTML outputs.
+    
+    Both the HTML fragment (html_posts/) and the complete page (blog/) are
+    written. This is the unit of work handed to the process pool, so it only
+    takes and returns picklable values.
+    
+    Args:
+        filepath: Path to the markdown source
+        html_posts_dir: Directory the HTML fragment is written to
+        page_template: Post page template, compiled once per build
+        images: Published images, keyed by posts/images filename
+        known_hash: Content hash recorded by the previous build, if any
+        slugs: Slugs of the static tag pages the post's tags link to
+        
+    Returns:
+        Tuple of (content hash, index entry, search terms, images used),
+        where the index entry is None if the content matched ``known_hash``
+        and nothing was rendered
+    """
+    with open(filepath, 'rb') as f:
+        raw = f.read()
+    digest = hash_bytes(raw)
+    
+    # Touched but identical content: nothing to render
+    if known_hash is not None and digest == known_hash:
+        return digest, None, [], {}
+    
+    base_filename = os.path.splitext(os.path.basename(filepath))[0]
+    html_content, post_data = render_post(raw.decode('utf-8'), base_filename)
+    # Inline images were saved to posts/images by extract_inline_images and published
+    if 'data:image/' in html_content:
+        save = image_saver(os.path.dirname(filepath), published_names(images))
+        html_content, _ = extract_data_uris(html_content, save)
+    html_content, used_images = rewrite_image_refs(html_content, images)
+    
+    html_filepath = os.path.join(html_posts_dir, post_data['html_filename'])
+    with open(html_filepath, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    
+    write_post_page(page_template, post_data, html_content, slugs)
+    return digest, post_data, post_terms(post_data, html_content), used_images
+
+def extract_inline_images(manifest: BuildManifest, posts_dir: str, force: bool = False,
+                          echo: Callable[[str], Any] = print) -> int:
+    """
+    Decode the data-URI images of new and edited posts into posts/images.
+
+    This runs before the images are published, so inline images go to the
+    image store like any other; the post sources are not modified.
+
+    Args:
+        manifest: The build manifest
+        posts_dir: Directory of markdown posts
+        force: Check every post, ignoring the build manifest
+        echo: Function used to report progress
+
+    Returns:
+        Number of images extracted
+    """
+    save = None
+    total = 0
+    for filename in sorted(os.listdir(posts_dir)):
+        if not filename.endswith('.md'):
+            continue
+        filepath = os.path.join(posts_dir, filename)
+        if not force and manifest.is_fresh(manifest.lookup(filepath, os.stat(filepath))):
+            continue
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+        if 'data:image/' not in content:
+            continue
+        if save is None:
+            # Images recorded by the last build are matched by size and mtime, not read
+            images_dir = os.path.join(posts_dir, 'images')
+            save = image_saver(posts_dir, existing_images(images_dir, manifest.meta.get('images')))
+        _, count = extract_data_uris(content, save)
+        if count:
+            echo(f"Extracted {count} inline images from {filepath}")
+            total += count
+    return total
+
+def _render_all(tasks: List[Tuple[str, Optional[str]]], html_posts_dir: str, page_template: Template,
+                images: Dict[str, Any], jobs: int, slugs: Dict[str, str],
+                profiler: Profiler) -> List[Tuple[str, Optional[Dict[str, Any]], List[str], Dict[str, Any]]]:
+    """Run render_post_file over the tasks, in a process pool when jobs > 1, profiling each post."""
+    if jobs <= 1 or len(tasks) <= 1:
+        results = []
+        for filepath, known_hash in tasks:
+            profiler.begin(filepath, 'post')
+            results.append(render_post_file(filepath, html_posts_dir, page_template, images, known_hash, slugs))
+            profiler.end()
+        return results
+    
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as executor:
+        if not profiler.enabled:
+            futures = [
+                executor.submit(render_post_file, filepath, html_posts_dir, page_template, images, known_hash,
+                                slugs)
+                for filepath, known_hash in tasks
+            ]
+            # Collect in submission order so the merge below is deterministic
+            return [future.result() for future in futures]
+        
+        # Workers profile their own posts and send the spans back with the result
+        futures = [
+            executor.submit(run_profiled, profiler.origin, filepath, render_post_file, filepath, html_posts_dir,
+                            page_template, images, known_hash, slugs)
+            for filepath, known_hash in tasks
+        ]
+        results = []
+        for future in futures:
+            result, spans = future.result()
+            profiler.merge(spans)
+            results.append(result)
+        return results
+
+def generate_html_posts(force: bool = False, jobs: int = 1,
+                        echo: Callable[[str], Any] = print, profiler: Optional[Profiler] = None) -> int:
+    """
+    Generate static HTML files for each markdown post.
+    
+    Each post is written both as an HTML fragment in html_posts/ and as a
+    complete page in blog/, rendered from templates/post.html. Posts whose
+    content and render options are unchanged since the last build (according
+    to the build manifest) are skipped, and their index entries are merged
+    from the manifest instead of being re-parsed. When only the template
+    changes, pages are re-assembled from the existing fragments.
+    
+    Header/footer components are inlined into the post pages and into the
+    site's top-level pages; a component edit only rewrites pages that use it.
+    
+    Images in posts/images are published to the content-addressed image
+    store, with resized WebP copies when Pillow is installed, and <img> tags
+    are pointed at it with explicit dimensions, srcset and lazy loading; a
+    post is re-rendered when an image it uses changes. Inline data-URI
+    images are decoded into posts/images first and published the same way.
+    
+    Post metadata is mirrored into the SQLite store in .blog-cache, so other
+    commands can list and filter posts without parsing them.
+    
+    The RSS feed (rss.xml, plus rss-archive.xml for older items) is
+    regenerated from the index and only rewritten when it changes. Every tag
+    and category gets a static listing page and feed in tags/<slug>/, which
+    are only rendered again when the tag's posts change.
+    
+    Args:
+        force: Re-render every post, ignoring the build manifest
+        jobs: Number of worker processes used for rendering (0 = all cores)
+        echo: Function used to report progress
+        profiler: Records each phase of the build and each rendered post
+        
+    Returns:
+        Number of posts rendered
+    """
+    posts_dir = 'posts'
+    html_posts_dir = 'html_posts'
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    profiler = profiler or Profiler(enabled=False)
+    
+    profiler.phase('templates')
+    # Create directory for HTML posts if it doesn't exist
+    if not os.path.exists(html_posts_dir):
+        os.makedirs(html_posts_dir)
+    
+    manifest = BuildManifest.load(os.path.join(CACHE_DIR, MANIFEST_FILENAME), RENDER_OPTIONS)
+    
+    # Inline the header/footer into the template once; every post page shares it
+    components = ComponentCache()
+    with open(POST_TEMPLATE, 'r', encoding='utf-8') as f:
+        template_source = prepare_post_template(f.read())
+    # Relative includes resolve the same way for every page in blog/
+    template_source, _ = expand_includes(template_source, f"{POST_PAGES_DIR}/post.html", components)
+    template_changed = manifest.set_meta('post_template', hash_bytes(template_source.encode('utf-8')))
+    # Parsed once here; workers receive the compiled form
+    page_template = compile_template(template_source)
+    
+    profiler.phase('inline images')
+    extract_inline_images(manifest, posts_dir, force, echo)
+    profiler.phase('images')
+    images = sync_images(manifest, os.path.join(posts_dir, 'images'), echo=echo)
+    
+    profiler.phase('scan')
+    seen = []
+    tasks = []
+    stats = {}
+    
+    for filename in sorted(os.listdir(posts_dir)):
+        if not filename.endswith('.md'):
+            continue
+        
+        filepath = os.path.join(posts_dir, filename)
+        seen.append(filepath)
+        st = os.stat(filepath)
+        
+        # Unchanged size and mtime: skip without reading the file
+        entry = manifest.entries.get(filepath)
+        images_current = entry is not None and refs_current(entry.get('images', {}), images)
+        if not force and images_current and manifest.is_fresh(manifest.lookup(filepath, st)):
+            continue
+        
+        # Only trust the recorded hash if the output it describes is still valid
+        fresh = not force and images_current and manifest.is_fresh(entry)
+        known_hash = entry['hash'] if fresh else None
+        tasks.append((filepath, known_hash))
+        stats[filepath] = st
+    
+    # Posts are rendered with the tag slugs of the previous build (see below)
+    slugs = manifest.meta.get('tag_slugs', {})
+    rendered = set()
+    profiler.phase('render', posts=len(tasks), jobs=jobs)
+    results = _render_all(tasks, html_posts_dir, page_template, images, jobs, slugs, profiler)
+    for (filepath, _), (digest, post_data, terms, used_images) in zip(tasks, results):
+        if post_data is None:
+            manifest.touch(filepath, stats[filepath])
+            continue
+        
+        html_filepath = os.path.join(html_posts_dir, post_data['html_filename'])
+        echo(f"Generated {html_filepath}")
+        manifest.record(filepath, stats[filepath], digest, html_filepath, post_data,
+                        terms=terms, images=used_images)
+        rendered.add(filepath)
+    
+    # Remove outputs of posts that were deleted since the last build
+    for entry in manifest.prune(seen):
+        for path in (entry['output'], post_page_path(entry['index'])):
+            if os.path.exists(path):
+                os.remove(path)
+                echo(f"Removed {path}")
+    
+    # Merge the index from the manifest rather than re-parsing every post
+    posts_data = manifest.index_entries()
+    sort_posts(posts_data)
+    
+    # Tag links point at the static tag pages; a tag whose slug is new or moved
+    # makes the pages showing it stale
+    old_slugs, slugs = slugs, tag_slugs(posts_data)
+    manifest.set_meta('tag_slugs', slugs)
+    
+    profiler.phase('post pages')
+    # Re-assemble pages from existing fragments if the template changed, a page is
+    # missing or one of its tag links changed
+    for filepath in sorted(manifest.entries):
+        entry = manifest.entries[filepath]
+        links_changed = any(old_slugs.get(tag) != slugs.get(tag) for tag in entry['index']['tags'])
+        if filepath in rendered and not links_changed:
+            continue
+        if not template_changed and not force and not links_changed \
+                and os.path.exists(post_page_path(entry['index'])):
+            continue
+        with open(entry['output'], 'r', encoding='utf-8') as f:
+            html_content = f.read()
+        echo(f"Generated {write_post_page(page_template, entry['index'], html_content, slugs)}")
+    
+    profiler.phase('site pages')
+    expand_site_pages(manifest, components, echo)
+    profiler.phase('tag pages')
+    write_tag_pages(posts_data, slugs, manifest, components, force, echo)
+    
+    profiler.phase('search index')
+    # Rebuild the search index from the terms recorded for each post
+    doc_ids = assign_doc_ids([post['filename'] for post in posts_data], manifest.meta.get('search_ids', {}))
+    manifest.set_meta('search_ids', doc_ids)
+    terms = {entry['index']['filename']: entry.get('terms', []) for entry in manifest.entries.values()}
+    search_changes = write_search_index(posts_data, terms, doc_ids)
+    
+    profiler.phase('manifest')
+    manifest.save()
+    # Mirror the manifest into the metadata store queried by `blog-cli post list`
+    with PostStore() as store:
+        store.merge(manifest.entries)
+    echo(f"Rendered {len(rendered)} of {len(seen)} posts")
+    
+    profiler.phase('index')
+    # Write enhanced index to JSON file, plus the paginated shards readers fetch
+    if write_index(posts_data):
+        echo(f"Generated index with {len(posts_data)} posts")
+    else:
+        echo(f"Index unchanged ({len(posts_data)} posts)")
+    if search_changes:
+        echo(f"Updated {len(search_changes)} search index files")
+    profiler.phase('feed')
+    for path in build_feed(posts_data):
+        echo(f"Updated {path}" if os.path.exists(path) else f"Removed {path}")
+    
+    profiler.phase('stylesheet')
+    if write_stylesheet():
+        echo("Generated code highlighting stylesheet")
+    
+    profiler.end()
+    return len(rendered)
@@ -0,0 +1,198 @@
+"""
+Utility functions for generating the RSS feed from the post index
+"""
+
+import os
+import json
+import heapq
+import filecmp
+import itertools
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+from xml.sax.saxutils import escape
+
+from blog_cli.utils.frontmatter import parse_date
+
+SITE_URL = 'https://kjackson87.github.io'
+FEED_FILE = 'rss.xml'
+ARCHIVE_FILE = 'rss-archive.xml'
+FEED_TITLE = 'Kyle Jackson | AI & ML Specialist'
+FEED_DESCRIPTION = (
+    'Updates on AI research, publications, and work in Responsible AI and LLM evaluation systems'
+)
+
+# Hand-curated items linking elsewhere (papers, talks), merged into the feed by date
+EXTERNAL_ITEMS_FILE = 'feed-items.json'
+
+# The main feed holds the newest FEED_SIZE items; older ones go to the archive
+FEED_SIZE = 20
+
+# Posts only have a day, so every item is dated at noon
+RFC822_FORMAT = '%a, %d %b %Y 12:00:00 GMT'
+
+def load_external_items(path: str = EXTERNAL_ITEMS_FILE) -> List[Dict[str, str]]:
+    """
+    Load the hand-curated feed items.
+
+    Args:
+        path: JSON file holding a list of {title, link, description, date} objects
+
+    Returns:
+        The items (empty if the file does not exist)
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def post_item(post: Dict[str, Any], site_url: str = SITE_URL) -> Dict[str, Any]:
+    """
+    Build the feed item for a post-index.json entry.
+
+    Args:
+        post: Index entry of the post
+        site_url: Absolute URL of the site
+
+    Returns:
+        Dictionary with the item's title, link, description, date and categories
+    """
+    return {
+        'title': post['title'],
+        'link': f"{site_url}/{post['url']}",
+        'description': post['excerpt'] or post['title'],
+        'date': post['date'],
+        'categories': post['tags'] + [c for c in post['categories'] if c not in post['tags']],
+    }
+
+def _item_date(item: Dict[str, Any]) -> datetime:
+    """Return an item's date for ordering (undated items sort last)."""
+    return (parse_date(item['date']) if item.get('date') else None) or datetime.min
+
+def merge_items(posts: Iterable[Dict[str, Any]], external: List[Dict[str, Any]],
+                site_url: str = SITE_URL) -> Iterator[Dict[str, Any]]:
+    """
+    Merge posts and external items into one stream, newest first.
+
+    Args:
+        posts: Index entries, already sorted newest first
+        external: Hand-curated items, in any order
+        site_url: Absolute URL of the site
+
+    Returns:
+        Iterator of feed items
+    """
+    external = sorted(external, key=lambda item: item['link'])
+    external.sort(key=_item_date, reverse=True)
+    post_items = (post_item(post, site_url) for post in posts)
+    return heapq.merge(post_items, external, key=_item_date, reverse=True)
+
+def pub_date(item: Dict[str, Any]) -> Optional[str]:
+    """Return an item's date in RFC 822 format, or None if it has no valid date."""
+    date = parse_date(item['date']) if item.get('date') else None
+    return date.strftime(RFC822_FORMAT) if date else None
+
+def write_item(f: TextIO, item: Dict[str, Any]) -> None:
+    """Write one <item> element."""
+    f.write('        <item>\n')
+    f.write(f"            <title>{escape(item['title'])}</title>\n")
+    f.write(f"            <link>{escape(item['link'])}</link>\n")
+    f.write(f"            <description>{escape(item.get('description', ''))}</description>\n")
+    for category in item.get('categories', []):
+        f.write(f"            <category>{escape(category)}</category>\n")
+    date = pub_date(item)
+    if date:
+        f.write(f"            <pubDate>{date}</pubDate>\n")
+    f.write(f"            <guid>{escape(item['link'])}</guid>\n")
+    f.write('        </item>\n')
+
+def write_feed(path: str, items: Iterable[Dict[str, Any]], site_url: str = SITE_URL,
+               archive_url: Optional[str] = None, title: str = FEED_TITLE,
+               self_url: Optional[str] = None) -> bool:
+    """
+    Stream a feed to disk, replacing the file only if its content changed.
+
+    The channel's lastBuildDate is the date of the newest item rather than
+    the current time, so an unchanged feed is byte-for-byte identical.
+
+    Args:
+        path: Destination path
+        items: Feed items, newest first
+        site_url: Absolute URL of the site
+        archive_url: URL of the archive with older items, if there is one
+        title: Title of the channel
+        self_url: URL the feed is published at (the site root plus the
+            file name by default)
+
+    Returns:
+        True if the file was written
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8" ?>\n')
+        f.write('<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n')
+        f.write('    <channel>\n')
+        f.write(f"        <title>{escape(title)}</title>\n")
+        f.write(f"        <link>{site_url}</link>\n")
+        f.write(f"        <description>{escape(FEED_DESCRIPTION)}</description>\n")
+        f.write('        <language>en-us</language>\n')
+        self_url = self_url or f"{site_url}/{os.path.basename(path)}"
+        f.write(f'        <atom:link href="{self_url}" rel="self" type="application/rss+xml" />\n')
+        if archive_url:
+            f.write(f'        <atom:link href="{archive_url}" rel="prev-archive" type="application/rss+xml" />\n')
+
+        items = iter(items)
+        first = next(items, None)
+        if first is not None:
+            date = pub_date(first)
+            if date:
+                f.write(f"        <lastBuildDate>{date}</lastBuildDate>\n")
+            write_item(f, first)
+        for item in items:
+            write_item(f, item)
+
+        f.write('    </channel>\n')
+        f.write('</rss>\n')
+
+    if os.path.exists(path) and filecmp.cmp(tmp_path, path, shallow=False):
+        os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, path)
+    return True
+
+def build_feed(posts: List[Dict[str, Any]], feed_size: int = FEED_SIZE,
+               feed_path: str = FEED_FILE, archive_path: str = ARCHIVE_FILE,
+               external_path: str = EXTERNAL_ITEMS_FILE, site_url: str = SITE_URL) -> List[str]:
+    """
+    Write the RSS feed (and its archive) from the post index in one pass.
+
+    Posts and the hand-curated external items are merged by date; the newest
+    ``feed_size`` go to the main feed and the rest to the archive, which is
+    removed when there is nothing to put in it.
+
+    Args:
+        posts: Index entries, already sorted newest first
+        feed_size: Number of items in the main feed
+        feed_path: Path of the main feed
+        archive_path: Path of the archive feed
+        external_path: Path of the hand-curated items
+        site_url: Absolute URL of the site
+
+    Returns:
+        Paths of the files that were written or removed
+    """
+    items = merge_items(posts, load_external_items(external_path), site_url)
+    newest = [item for _, item in zip(range(feed_size), items)]
+    # Peek at the stream to know whether there is an archive to link to
+    older = next(items, None)
+    archive_url = f"{site_url}/{os.path.basename(archive_path)}" if older else None
+
+    changed = []
+    if write_feed(feed_path, newest, site_url, archive_url):
+        changed.append(feed_path)
+    if older is not None:
+        if write_feed(archive_path, itertools.chain([older], items), site_url):
+            changed.append(archive_path)
+    elif os.path.exists(archive_path):
+        os.remove(archive_path)
+        changed.append(archive_path)
+    return changed
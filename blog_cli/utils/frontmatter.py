@@ -2,9 +2,187 @@
 Utility functions for handling frontmatter in markdown files
 """
 
-import re
+import io
+import os
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, Iterator, List, Optional, Any, Tuple, Union
+
+# Frontmatter keys whose values are lists, either inline ([a, b]) or as "- item" lines
+LIST_FIELDS = ('tags', 'categories')
+
+# Date formats accepted in the "date" field, most common first
+DATE_FORMATS = ('%B %d, %Y', '%Y-%m-%d', '%b %d, %Y')
+
+class Post:
+    """
+    Compact record of a post's parsed frontmatter.
+    
+    Attributes:
+        title: The post title ("" if missing)
+        date: The date exactly as written in the frontmatter
+        published: The date parsed into a datetime (None if missing or unparseable)
+        tags: List of tags
+        categories: List of categories
+        image: Image path, or None
+        body_offset: Index of the first character of the body in the source
+            (0 if the source has no frontmatter)
+    """
+    
+    __slots__ = ('title', 'date', 'published', 'tags', 'categories', 'image', 'body_offset')
+    
+    def __init__(self):
+        self.title = ""
+        self.date = ""
+        self.published = None
+        self.tags = []
+        self.categories = []
+        self.image = None
+        self.body_offset = 0
+    
+    @property
+    def has_frontmatter(self) -> bool:
+        """Whether the source started with a frontmatter block."""
+        return self.body_offset > 0
+    
+    def body(self, content: str) -> str:
+        """Return the part of ``content`` after the frontmatter."""
+        return content[self.body_offset:]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the frontmatter fields as a dictionary."""
+        return {
+            'title': self.title,
+            'date': self.date,
+            'categories': self.categories,
+            'tags': self.tags,
+            'image': self.image
+        }
+    
+    def __repr__(self):
+        return f"Post(title={self.title!r}, date={self.date!r}, body_offset={self.body_offset})"
+
+_date_cache: Dict[str, Optional[datetime]] = {}
+
+def parse_date(value: str) -> Optional[datetime]:
+    """
+    Parse a frontmatter date in any of the accepted formats.
+    
+    Args:
+        value: The date string
+        
+    Returns:
+        The parsed datetime, or None if the value is empty or not recognised
+    """
+    if value in _date_cache:
+        return _date_cache[value]
+    
+    parsed = None
+    for fmt in DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(value, fmt)
+            break
+        except ValueError:
+            continue
+    
+    _date_cache[value] = parsed
+    return parsed
+
+def _unquote(value: str) -> str:
+    """Strip surrounding whitespace and any quote characters from a list item."""
+    return value.strip().replace('"', '').replace("'", "")
+
+def _parse_list(value: str) -> List[str]:
+    """Parse an inline "[a, b, c]" list; anything else yields an empty list."""
+    if value.startswith('[') and value.endswith(']'):
+        return [_unquote(item) for item in value[1:-1].split(',') if item.strip()]
+    return []
+
+def parse_post(content: str) -> Post:
+    """
+    Parse the frontmatter of a markdown post in a single pass.
+    
+    The block is scanned line by line exactly once: each ``key: value`` line is
+    dispatched on its key, and ``- item`` lines are appended to the list field
+    they follow. Scanning stops at the closing ``---``, so the body is never
+    touched; its position is returned as ``body_offset``.
+    
+    Args:
+        content: The content of the markdown file
+        
+    Returns:
+        Post record (with empty fields and body_offset 0 if there is no frontmatter)
+    """
+    if not content.startswith('---'):
+        return Post()
+    
+    length = len(content)
+    line_end = content.find('\n')
+    if line_end == -1 or content[3:line_end].strip():
+        return Post()
+    
+    post = Post()
+    current_list = None
+    pos = line_end + 1
+    
+    while pos < length:
+        line_end = content.find('\n', pos)
+        if line_end == -1:
+            line_end = length
+        line = content[pos:line_end].strip()
+        pos = line_end + 1
+        
+        if not line:
+            continue
+        
+        if line == '---':
+            # Skip the whitespace separating the frontmatter from the body
+            offset = line_end
+            while offset < length and content[offset].isspace():
+                offset += 1
+            post.body_offset = offset
+            post.published = parse_date(post.date) if post.date else None
+            return post
+        
+        if current_list is not None and line[0] in '-*':
+            item = _unquote(line[1:])
+            if item:
+                current_list.append(item)
+            continue
+        
+        current_list = None
+        key, sep, value = line.partition(':')
+        if not sep:
+            continue
+        key = key.strip()
+        value = value.strip()
+        
+        if key == 'title':
+            post.title = value
+        elif key == 'date':
+            post.date = value
+        elif key == 'image':
+            post.image = value or None
+        elif key in LIST_FIELDS:
+            items = _parse_list(value)
+            setattr(post, key, items)
+            if not value:
+                # Items follow on their own "- item" lines
+                current_list = items
+    
+    # No closing delimiter: treat the whole file as body
+    return Post()
+
+def strip_frontmatter(content: str) -> str:
+    """
+    Return the content with its frontmatter removed.
+    
+    Args:
+        content: The content of the markdown file
+        
+    Returns:
+        The body of the post
+    """
+    return content[parse_post(content).body_offset:]
 
 def extract_frontmatter(content: str) -> Dict[str, Any]:
     """
@@ -16,43 +194,91 @@ def extract_frontmatter(content: str) -> Dict[str, Any]:
     Returns:
         Dictionary containing the frontmatter fields
     """
-    frontmatter_match = re.match(r'^---\s+([\s\S]*?)\s+---', content)
-    if not frontmatter_match:
+    post = parse_post(content)
+    if not post.has_frontmatter:
         return {}
+    return post.to_dict()
+
+def extract_excerpt(body: str) -> str:
+    """
+    Extract the excerpt of a post: its first paragraph with headings removed.
     
-    frontmatter = frontmatter_match[1]
-    
-    # Extract title
-    title_match = re.search(r'title:\s*(.+)', frontmatter)
-    title = title_match.group(1).strip() if title_match else ""
-    
-    # Extract date
-    date_match = re.search(r'date:\s*(.+)', frontmatter)
-    date = date_match.group(1).strip() if date_match else ""
-    
-    # Extract categories/tags
-    categories = []
-    cat_match = re.search(r'categories:\s*\[(.*?)\]', frontmatter)
-    if cat_match:
-        categories = [cat.strip() for cat in cat_match.group(1).split(',')]
+    Args:
+        body: The post content after the frontmatter
+        
+    Returns:
+        Excerpt string
+    """
+    end = body.find('\n\n')
+    return _clean_excerpt(body[:end] if end != -1 else body[:150] + '...')
+
+def read_post_header(path: Union[str, os.PathLike]) -> Tuple[Post, str]:
+    """
+    Read a post's frontmatter and excerpt without loading the rest of the file.
     
-    # Extract tags
-    tags = []
-    tags_match = re.search(r'tags:\s*\[(.*?)\]', frontmatter)
-    if tags_match:
-        tags = [tag.strip() for tag in tags_match.group(1).split(',')]
+    The file is read line by line and reading stops at the end of the first
+    paragraph after the frontmatter, so the cost does not depend on how long
+    the post is. The result is the same as parsing the whole file with
+    parse_post and extract_excerpt.
     
-    # Extract image
-    image_match = re.search(r'image:\s*(.+)', frontmatter)
-    image = image_match.group(1).strip() if image_match else None
+    Args:
+        path: Path to the markdown file
+        
+    Returns:
+        Tuple of (Post record, excerpt)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        line = f.readline()
+        header = [line]
+        
+        if line.startswith('---') and not line[3:].strip():
+            # Collect the frontmatter block, including its closing delimiter
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                header.append(line)
+                if line.strip() == '---':
+                    break
+        
+        post = parse_post(''.join(header))
+        if not post.has_frontmatter:
+            # Not frontmatter after all: what was read is the start of the body
+            pending = ''.join(header)
+        else:
+            # Skip the whitespace between the frontmatter and the body
+            while True:
+                line = f.readline()
+                stripped = line.lstrip()
+                post.body_offset += len(line) - len(stripped)
+                if stripped or not line:
+                    pending = stripped
+                    break
+        
+        # Accumulate the first paragraph, i.e. everything up to the first "\n\n"
+        paragraph = []
+        for line in _iter_lines(pending, f):
+            if line == '\n' and paragraph:
+                # An empty line after a complete line: the paragraph ends here
+                return post, _clean_excerpt(''.join(paragraph)[:-1])
+            paragraph.append(line)
     
-    return {
-        'title': title,
-        'date': date,
-        'categories': categories,
-        'tags': tags,
-        'image': image
-    }
+    # The body is a single paragraph
+    return post, _clean_excerpt(''.join(paragraph)[:150] + '...')
+
+def _iter_lines(pending: str, f) -> Iterator[str]:
+    """Yield the lines of ``pending`` followed by the remaining lines of ``f``."""
+    yield from io.StringIO(pending)
+    yield from f
+
+def _clean_excerpt(excerpt: str) -> str:
+    """Remove heading lines from an excerpt and trim it."""
+    lines = excerpt.split('\n')
+    return '\n'.join('' if _is_heading(line) else line for line in lines).strip()
+
+def _is_heading(line: str) -> bool:
+    """Whether a markdown line is an ATX heading ("# Title")."""
+    return line.startswith('#') and line.lstrip('#')[:1].isspace()
 
 def add_frontmatter(content: str, metadata: Dict[str, Any]) -> str:
     """
@@ -66,7 +292,7 @@ def add_frontmatter(content: str, metadata: Dict[str, Any]) -> str:
         Updated content with frontmatter
     """
     # Remove existing frontmatter if present
-    content_without_frontmatter = re.sub(r'^---\s+[\s\S]*?---\s+', '', content)
+    content_without_frontmatter = strip_frontmatter(content)
     
     # Format date if not provided
     if 'date' not in metadata or not metadata['date']:
@@ -96,17 +322,17 @@ def update_frontmatter(content: str, metadata: Dict[str, Any]) -> str:
     Returns:
         Updated content with modified frontmatter
     """
-    frontmatter_match = re.match(r'^---\s+([\s\S]*?)\s+---', content)
-    if not frontmatter_match:
+    post = parse_post(content)
+    if not post.has_frontmatter:
         # No frontmatter found, add it
         return add_frontmatter(content, metadata)
     
-    existing_metadata = extract_frontmatter(content)
+    existing_metadata = post.to_dict()
     # Merge new metadata with existing
     for key, value in metadata.items():
         if value is not None:
             existing_metadata[key] = value
     
     # Replace the frontmatter
-    content_without_frontmatter = re.sub(r'^---\s+[\s\S]*?---\s+', '', content)
+    content_without_frontmatter = strip_frontmatter(content)
     return add_frontmatter(content_without_frontmatter, existing_metadata) 
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Utility functions for highlighting code blocks at build time
+"""
+
+import os
+import re
+import json
+from html import unescape
+from typing import Optional
+
+try:
+    import pygments
+    from pygments import highlight
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import get_lexer_by_name
+    from pygments.lexers.special import TextLexer
+    from pygments.util import ClassNotFound
+except ImportError:
+    pygments = None
+
+from blog_cli.utils.manifest import CACHE_DIR, hash_bytes, write_if_changed
+
+# Highlighted blocks are cached here, one file per distinct (language, code) pair
+HIGHLIGHT_CACHE_DIR = os.path.join(CACHE_DIR, 'highlight')
+HIGHLIGHT_STYLE = 'default'
+STYLESHEET = 'css/highlight.css'
+
+# Same markup the codehilite extension produced, so existing styles keep working
+FORMATTER_OPTIONS = {'cssclass': 'codehilite', 'wrapcode': True}
+
+# Code blocks as emitted by the fenced_code extension (and indented code blocks)
+CODE_BLOCK_RE = re.compile(
+    r'<pre><code(?: class="language-(?P<lang>[^"]+)")?>(?P<code>.*?)</code></pre>',
+    re.DOTALL
+)
+
+# Everything that affects highlighted output; part of every cache key
+HIGHLIGHT_OPTIONS = {
+    'pygments': pygments.__version__ if pygments else None,
+    'style': HIGHLIGHT_STYLE,
+    'formatter': FORMATTER_OPTIONS,
+}
+
+def highlight_block(code: str, lang: Optional[str], cache_dir: str = HIGHLIGHT_CACHE_DIR) -> str:
+    """
+    Highlight a single code block, reusing the cached result when there is one.
+
+    Blocks without a language (e.g. notebook output) or with one Pygments does
+    not know are escaped but not coloured, rather than guessing a lexer.
+
+    Args:
+        code: The block's source code
+        lang: Language from the fence, or None
+        cache_dir: Directory of cached highlighted blocks
+
+    Returns:
+        HTML of the highlighted block
+    """
+    key = hash_bytes(json.dumps([lang, code, HIGHLIGHT_OPTIONS]).encode('utf-8'))
+    cache_path = os.path.join(cache_dir, f"{key}.html")
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        pass
+
+    try:
+        lexer = get_lexer_by_name(lang) if lang else TextLexer()
+    except ClassNotFound:
+        lexer = TextLexer()
+    html = highlight(code, lexer, HtmlFormatter(**FORMATTER_OPTIONS))
+
+    # Write atomically: several render workers may highlight the same block
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    os.replace(tmp_path, cache_path)
+    return html
+
+def highlight_code_blocks(html: str, cache_dir: str = HIGHLIGHT_CACHE_DIR) -> str:
+    """
+    Highlight every code block of a rendered post.
+
+    Args:
+        html: Post HTML rendered with the fenced_code extension
+        cache_dir: Directory of cached highlighted blocks
+
+    Returns:
+        HTML with the code blocks highlighted (unchanged if Pygments is not installed)
+    """
+    if pygments is None:
+        return html
+    return CODE_BLOCK_RE.sub(
+        lambda match: highlight_block(unescape(match.group('code')), match.group('lang'), cache_dir),
+        html
+    )
+
+def write_stylesheet(path: str = STYLESHEET) -> bool:
+    """
+    Write the stylesheet for highlighted code blocks.
+
+    Args:
+        path: Destination path, relative to the site root
+
+    Returns:
+        True if the file was written
+    """
+    if pygments is None:
+        return False
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    css = HtmlFormatter(style=HIGHLIGHT_STYLE, **FORMATTER_OPTIONS).get_style_defs('.codehilite')
+    return write_if_changed(path, css + '\n')
@@ -0,0 +1,416 @@
+"""
+Utility functions for the content-addressed image store
+"""
+
+import os
+import re
+import base64
+import binascii
+import shutil
+import struct
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from blog_cli.utils.manifest import BuildManifest, hash_bytes, store_blob
+
+# Images are published once, under a name derived from their content, so
+# identical files are stored once and a URL never changes meaning
+IMAGE_STORE_DIR = 'assets/images'
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp')
+HASH_LENGTH = 16
+
+# Resized WebP copies are made of raster images when Pillow is installed;
+# they are named after the source hash, so each is only ever made once
+RESPONSIVE_WIDTHS = (480, 800, 1200)
+DERIVATIVE_QUALITY = 80
+DERIVATIVE_SOURCES = ('.png', '.jpg', '.jpeg', '.webp')
+# Post content is at most 800px wide, less the page padding
+CONTENT_WIDTH = 768
+IMAGE_SIZES = f'(max-width: 800px) 100vw, {CONTENT_WIDTH}px'
+
+# Everything that changes the published images or <img> markup
+IMAGE_OPTIONS = {
+    'store': IMAGE_STORE_DIR,
+    'derivatives': list(RESPONSIVE_WIDTHS) if Image else None,
+    'quality': DERIVATIVE_QUALITY,
+    'sizes': IMAGE_SIZES,
+}
+
+# Posts refer to their images as /posts/images/<name> (or images/<name>)
+IMAGE_REF_PREFIXES = ('/posts/images/', 'posts/images/', 'images/')
+IMG_TAG_RE = re.compile(r'<img\b[^>]*>')
+
+# Base64 data-URI images in an <img> src or a markdown image link; inline
+# images are about a third larger than the file and cannot be cached
+DATA_URI_RE = re.compile(
+    r'(?P<prefix>\bsrc=["\']|\]\()data:image/(?P<type>png|jpeg|jpg|gif|webp|svg\+xml);base64,'
+    r'(?P<data>[A-Za-z0-9+/]+=*)(?=["\')\s])'
+)
+DATA_URI_EXTENSIONS = {
+    'png': '.png', 'jpeg': '.jpg', 'jpg': '.jpg', 'gif': '.gif', 'webp': '.webp', 'svg+xml': '.svg',
+}
+SRC_ATTR_RE = re.compile(r'\bsrc="([^"]+)"')
+
+def image_url(path: str) -> str:
+    """Return the site URL of a file in the image store."""
+    return '/' + path.replace(os.sep, '/')
+
+def link_or_copy(src: str, dst: str) -> None:
+    """
+    Hardlink a file into place, falling back to a copy where links are not supported.
+
+    Args:
+        src: Existing file
+        dst: Path to create
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+def _add_image_name(named: Dict[str, str], key: str, name: str) -> None:
+    """Map a content-hash name to an image, preferring images saved under their own name to hash-named copies."""
+    if named.get(key, key) == key:
+        named[key] = name
+
+def existing_images(images_dir: str, recorded: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, str]:
+    """
+    Map the content-hash name of each image in a directory to an image with that content.
+
+    Images whose size and mtime match the build manifest's record (see
+    sync_images) are not read; only new and edited images are hashed.
+    Images saved under their own name (say by an earlier nbconvert
+    conversion) are preferred to hash-named copies of them.
+
+    Args:
+        images_dir: Directory of images (normally posts/images)
+        recorded: The manifest's image records, keyed by filename
+
+    Returns:
+        Mapping of ``<hash><ext>`` to the filename of an existing image
+    """
+    recorded = recorded or {}
+    named: Dict[str, str] = {}
+    names = sorted(os.listdir(images_dir)) if os.path.isdir(images_dir) else []
+    for name in names:
+        path = os.path.join(images_dir, name)
+        ext = os.path.splitext(name)[1].lower()
+        if ext not in IMAGE_EXTENSIONS or not os.path.isfile(path):
+            continue
+        st = os.stat(path)
+        record = recorded.get(name)
+        if record is not None and record['size'] == st.st_size and record['mtime_ns'] == st.st_mtime_ns:
+            key = os.path.basename(record['stored'])
+        else:
+            with open(path, 'rb') as f:
+                key = f"{hash_bytes(f.read())[:HASH_LENGTH]}{ext}"
+        _add_image_name(named, key, name)
+    return named
+
+def published_names(images: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """Map the content-hash name of each published image (see sync_images) to its posts/images filename."""
+    named: Dict[str, str] = {}
+    for name in sorted(images):
+        _add_image_name(named, os.path.basename(images[name]['url']), name)
+    return named
+
+def save_image(data: bytes, ext: str, images_dir: str, existing: Optional[Dict[str, str]] = None) -> str:
+    """
+    Save image bytes to a post images directory under a content-hash name.
+
+    Identical images are only written once. The build then publishes the
+    file to the image store without copying it again.
+
+    Args:
+        data: The image file's bytes
+        ext: File extension, including the dot
+        images_dir: Directory to save into (normally posts/images)
+        existing: Images already in the directory (see existing_images); an
+            image with the same content is referenced instead of being copied
+
+    Returns:
+        Filename of the saved image
+    """
+    if existing:
+        name = existing.get(f"{hash_bytes(data)[:HASH_LENGTH]}{ext}")
+        if name is not None:
+            return name
+    return store_blob(data, ext, images_dir, HASH_LENGTH)
+
+def is_image(data: bytes, ext: str) -> bool:
+    """Check that bytes decoded from a data URI are a complete image of the declared type."""
+    if ext == '.svg':
+        return b'<svg' in data[:1024]
+    if ext == '.webp':
+        return data[:4] == b'RIFF' and data[8:12] == b'WEBP'
+    if image_size(data) is None:
+        return False
+    # Check the end marker too, so a truncated image is left alone
+    if ext == '.png':
+        return data[-8:-4] == b'IEND'
+    if ext == '.gif':
+        return data.rstrip(b'\0')[-1:] == b';'
+    return b'\xff\xd9' in data[-16:]
+
+def extract_data_uris(text: str, save: Callable[[bytes, str], str]) -> Tuple[str, int]:
+    """
+    Decode the data-URI images of a post or page into files.
+
+    Only image sources are touched (``src="data:..."`` and ``](data:...)``),
+    and only when the data decodes to an image of the declared type.
+
+    Args:
+        text: Markdown or HTML
+        save: Function storing image bytes with a file extension and
+            returning the URL to reference (e.g. save_image into posts/images)
+
+    Returns:
+        Tuple of (text with the data URIs replaced by URLs, number replaced)
+    """
+    count = 0
+
+    def replace(match):
+        nonlocal count
+        try:
+            data = base64.b64decode(match.group('data'), validate=True)
+        except (binascii.Error, ValueError):
+            return match.group(0)
+        ext = DATA_URI_EXTENSIONS[match.group('type')]
+        if not is_image(data, ext):
+            return match.group(0)
+        count += 1
+        return match.group('prefix') + save(data, ext)
+
+    if 'data:image/' not in text:
+        return text, 0
+    text = DATA_URI_RE.sub(replace, text)
+    return text, count
+
+def image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Read the pixel dimensions of a PNG, GIF or JPEG from its header.
+
+    Args:
+        data: The image file's bytes
+
+    Returns:
+        Tuple of (width, height), or None for other formats
+    """
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+        return struct.unpack('>II', data[16:24])
+    if data[:6] in (b'GIF87a', b'GIF89a') and len(data) >= 10:
+        return struct.unpack('<HH', data[6:10])
+    if data[:2] == b'\xff\xd8':
+        # Walk the JPEG segments up to the first start-of-frame marker
+        offset = 2
+        while offset + 9 <= len(data) and data[offset] == 0xFF:
+            marker = data[offset + 1]
+            length = struct.unpack('>H', data[offset + 2:offset + 4])[0]
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+                return width, height
+            offset += 2 + length
+    return None
+
+def make_derivatives(stored: str, width: int, height: int,
+                     echo: Callable[[str], Any] = print) -> List[List[Any]]:
+    """
+    Make the resized WebP copies of an image in the store.
+
+    Copies that already exist are reused without opening the source.
+
+    Args:
+        stored: Path of the image in the store
+        width: Width of the image in pixels
+        height: Height of the image in pixels
+        echo: Function used to report progress
+
+    Returns:
+        List of [URL, width] pairs for the srcset, or an empty list if
+        Pillow is not installed or the format is not resized
+    """
+    stem, ext = os.path.splitext(stored)
+    if Image is None or ext.lower() not in DERIVATIVE_SOURCES:
+        return []
+
+    srcset = []
+    source = None
+    for target in [w for w in RESPONSIVE_WIDTHS if w < width] + [width]:
+        path = f"{stem}-{target}w-q{DERIVATIVE_QUALITY}.webp"
+        if not os.path.exists(path):
+            if source is None:
+                source = Image.open(stored)
+                source.load()
+            resized = source if target == width else source.resize(
+                (target, max(1, round(height * target / width))), Image.LANCZOS)
+            resized.save(path, 'WEBP', quality=DERIVATIVE_QUALITY)
+            echo(f"Generated {path}")
+        srcset.append([image_url(path), target])
+    return srcset
+
+def sync_images(manifest: BuildManifest, images_dir: str, store_dir: str = IMAGE_STORE_DIR,
+                echo: Callable[[str], Any] = print) -> Dict[str, Dict[str, Any]]:
+    """
+    Publish the images in posts/images to the content-addressed store.
+
+    The manifest records each image's size, mtime and hash, so unchanged
+    images are matched with a ``stat`` call and never read. New or changed
+    images are hashed and hardlinked into the store under ``<hash><ext>``;
+    store files no image maps to any more are removed. Since a store file
+    shares its inode with the source it was linked from, a source edited in
+    place takes its old store file with it and the file is re-linked from
+    any other image with the old content.
+
+    Each image's dimensions are recorded alongside it, and resized WebP
+    derivatives are made next to it in the store (see make_derivatives).
+
+    Args:
+        manifest: The build manifest
+        images_dir: Directory holding the source images
+        store_dir: Directory of the image store
+        echo: Function used to report progress
+
+    Returns:
+        Mapping of image filename to its published URL, width, height and
+        srcset candidates
+    """
+    recorded: Dict[str, Dict[str, Any]] = manifest.meta.get('images', {})
+    current: Dict[str, Dict[str, Any]] = {}
+    published: Dict[str, Dict[str, Any]] = {}
+
+    names = sorted(os.listdir(images_dir)) if os.path.isdir(images_dir) else []
+    for name in names:
+        src = os.path.join(images_dir, name)
+        ext = os.path.splitext(name)[1].lower()
+        if ext not in IMAGE_EXTENSIONS or not os.path.isfile(src):
+            continue
+
+        st = os.stat(src)
+        record = recorded.get(name)
+        changed = record is None or record['size'] != st.st_size or record['mtime_ns'] != st.st_mtime_ns
+        # A source edited in place also changed the store file linked to it
+        if changed and record is not None and os.path.exists(record['stored']) \
+                and os.path.samefile(src, record['stored']):
+            os.remove(record['stored'])
+        if changed or 'dimensions' not in record:
+            with open(src, 'rb') as f:
+                data = f.read()
+            digest = hash_bytes(data)
+            record = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                      'stored': os.path.join(store_dir, f"{digest[:HASH_LENGTH]}{ext}"),
+                      'dimensions': image_size(data)}
+        current[name] = record
+
+    for name, record in current.items():
+        stored = record['stored']
+        if not os.path.exists(stored):
+            os.makedirs(store_dir, exist_ok=True)
+            link_or_copy(os.path.join(images_dir, name), stored)
+            echo(f"Stored image {name} as {stored}")
+
+        dimensions = record['dimensions']
+        published[name] = {
+            'url': image_url(stored),
+            'width': dimensions[0] if dimensions else None,
+            'height': dimensions[1] if dimensions else None,
+            'srcset': make_derivatives(stored, dimensions[0], dimensions[1], echo) if dimensions else [],
+        }
+
+    # Drop store files (and derivatives) that no image maps to any more
+    if os.path.isdir(store_dir):
+        live = {os.path.splitext(os.path.basename(record['stored']))[0] for record in current.values()}
+        for filename in os.listdir(store_dir):
+            if filename.split('-')[0].split('.')[0] not in live:
+                os.remove(os.path.join(store_dir, filename))
+                echo(f"Removed unused image {filename}")
+
+    manifest.set_meta('images', current)
+    return published
+
+def image_name(src: str) -> Optional[str]:
+    """
+    Return the posts/images filename an <img> src refers to, if any.
+
+    Args:
+        src: The src attribute
+
+    Returns:
+        Image filename, or None for other URLs
+    """
+    for prefix in IMAGE_REF_PREFIXES:
+        if src.startswith(prefix):
+            name = src[len(prefix):]
+            return name if name and '/' not in name else None
+    return None
+
+def image_attributes(image: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Return the attributes added to the <img> tag of a published image.
+
+    Explicit dimensions let the browser reserve space before the image loads,
+    so the page does not shift; the srcset lets it fetch a smaller WebP copy.
+
+    Args:
+        image: Entry of the mapping returned by sync_images
+
+    Returns:
+        List of (name, value) pairs
+    """
+    attributes = []
+    if image['width'] and image['height']:
+        attributes += [('width', str(image['width'])), ('height', str(image['height']))]
+    if image['srcset']:
+        # Images narrower than the content column are shown at their own width
+        width = image['width']
+        sizes = IMAGE_SIZES if width >= CONTENT_WIDTH else f'(max-width: {width}px) 100vw, {width}px'
+        attributes += [
+            ('srcset', ', '.join(f"{url} {width}w" for url, width in image['srcset'])),
+            ('sizes', sizes),
+        ]
+    attributes += [('loading', 'lazy'), ('decoding', 'async')]
+    return attributes
+
+def rewrite_image_refs(html: str, images: Dict[str, Dict[str, Any]]
+                       ) -> Tuple[str, Dict[str, Optional[Dict[str, Any]]]]:
+    """
+    Point a post's <img> tags at the image store and add responsive attributes.
+
+    Attributes already present on a tag are left alone.
+
+    Args:
+        html: Rendered post HTML
+        images: Mapping returned by sync_images
+
+    Returns:
+        Tuple of (rewritten HTML, mapping of each referenced image filename
+        to the published image used, or None if the image does not exist)
+    """
+    used: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    def replace(match):
+        tag = match.group(0)
+        src = SRC_ATTR_RE.search(tag)
+        name = image_name(src.group(1)) if src else None
+        if name is None:
+            return tag
+        image = used[name] = images.get(name)
+        if image is None:
+            return tag
+
+        tag = tag[:src.start(1)] + image['url'] + tag[src.end(1):]
+        closing = ' />' if tag.endswith('/>') else '>'
+        body = tag[:-len(closing.strip())].rstrip()
+        for attribute, value in image_attributes(image):
+            if not re.search(rf'\s{attribute}=', body):
+                body += f' {attribute}="{value}"'
+        return body + closing
+
+    return IMG_TAG_RE.sub(replace, html), used
+
+def refs_current(used: Dict[str, Optional[Dict[str, Any]]], images: Dict[str, Dict[str, Any]]) -> bool:
+    """Check whether the images a post was rendered with are still the published ones."""
+    return all(images.get(name) == image for name, image in used.items())
@@ -0,0 +1,152 @@
+"""
+Utility functions for expanding header/footer components into pages at build time
+"""
+
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from blog_cli.utils.manifest import BuildManifest, hash_bytes
+
+# Matches both an empty include placeholder and one expanded by a previous build,
+# so expansion can be repeated whenever a component changes
+INCLUDE_RE = re.compile(
+    r'<div data-include="(?P<src>[^"]+)"[^>]*>(?:<!-- include -->.*?<!-- /include -->)?</div>',
+    re.DOTALL
+)
+
+class ComponentCache:
+    """Reads each component once per build and remembers its hash."""
+
+    def __init__(self, root: str = '.'):
+        self.root = root
+        self.contents: Dict[str, str] = {}
+
+    def resolve(self, src: str, page_path: str) -> str:
+        """
+        Resolve a data-include value to a path relative to the site root.
+
+        Args:
+            src: The data-include attribute ("/components/x.html" or a relative path)
+            page_path: Path of the including page, relative to the site root
+
+        Returns:
+            Normalised component path
+        """
+        if src.startswith('/'):
+            return os.path.normpath(src.lstrip('/'))
+        return os.path.normpath(os.path.join(os.path.dirname(page_path), src))
+
+    def get(self, component: str) -> Optional[str]:
+        """Return a component's HTML, or None if it does not exist."""
+        if component not in self.contents:
+            try:
+                with open(os.path.join(self.root, component), 'r', encoding='utf-8') as f:
+                    self.contents[component] = f.read().strip()
+            except OSError:
+                return None
+        return self.contents[component]
+
+    def hash(self, component: str) -> Optional[str]:
+        """Return the hash of a component's HTML, or None if it does not exist."""
+        content = self.get(component)
+        return hash_bytes(content.encode('utf-8')) if content is not None else None
+
+def expand_includes(html: str, page_path: str, components: ComponentCache) -> Tuple[str, List[str]]:
+    """
+    Inline the components referenced by data-include elements.
+
+    The element is kept, marked with data-included and with the component
+    between marker comments, so the result can be expanded again later and
+    js/include.js knows not to fetch it.
+
+    Args:
+        html: HTML of the page
+        page_path: Path of the page relative to the site root
+        components: Component cache for this build
+
+    Returns:
+        Tuple of (expanded HTML, components the page depends on)
+    """
+    deps = []
+
+    def replace(match):
+        src = match.group('src')
+        component = components.resolve(src, page_path)
+        content = components.get(component)
+        if content is None:
+            return match.group(0)
+        deps.append(component)
+        return f'<div data-include="{src}" data-included><!-- include -->\n{content}\n<!-- /include --></div>'
+
+    return INCLUDE_RE.sub(replace, html), sorted(set(deps))
+
+def expand_file(page_path: str, components: ComponentCache) -> Tuple[bool, List[str]]:
+    """
+    Expand the includes of a page in place.
+
+    Args:
+        page_path: Path of the page relative to the site root
+        components: Component cache for this build
+
+    Returns:
+        Tuple of (whether the file changed, components it depends on)
+    """
+    with open(os.path.join(components.root, page_path), 'r', encoding='utf-8') as f:
+        html = f.read()
+    expanded, deps = expand_includes(html, page_path, components)
+    if expanded != html:
+        with open(os.path.join(components.root, page_path), 'w', encoding='utf-8') as f:
+            f.write(expanded)
+    return expanded != html, deps
+
+def expand_site_pages(manifest: BuildManifest, components: ComponentCache,
+                      echo: Callable[[str], Any] = print) -> List[str]:
+    """
+    Expand includes in the site's top-level pages (index.html, blog.html, ...).
+
+    The manifest records, for each page, the components it depends on and its
+    size and mtime after expansion. A page is only re-expanded if it was edited
+    since, or if one of its components changed.
+
+    Args:
+        manifest: The build manifest
+        components: Component cache for this build
+        echo: Function used to report progress
+
+    Returns:
+        Pages that were rewritten
+    """
+    recorded: Dict[str, Dict[str, Any]] = dict(manifest.meta.get('include_pages', {}))
+    old_hashes: Dict[str, str] = manifest.meta.get('components', {})
+    new_hashes: Dict[str, str] = {}
+    rewritten = []
+
+    top_level = [name for name in os.listdir(components.root) if name.endswith('.html')]
+    pages = sorted(set(top_level) | set(recorded))
+    for page in pages:
+        path = os.path.join(components.root, page)
+        if not os.path.exists(path):
+            recorded.pop(page, None)
+            continue
+
+        st = os.stat(path)
+        record = recorded.get(page)
+        if record is not None and record['size'] == st.st_size and record['mtime_ns'] == st.st_mtime_ns:
+            for component in record['deps']:
+                new_hashes.setdefault(component, components.hash(component))
+            if all(old_hashes.get(c) == new_hashes[c] for c in record['deps']):
+                continue
+
+        changed, deps = expand_file(page, components)
+        for component in deps:
+            new_hashes.setdefault(component, components.hash(component))
+        if changed:
+            rewritten.append(page)
+            echo(f"Expanded includes in {page}")
+        st = os.stat(path)
+        recorded[page] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'deps': deps}
+
+    manifest.set_meta('include_pages', recorded)
+    manifest.set_meta('components', dict(old_hashes, **new_hashes))
+    return rewritten
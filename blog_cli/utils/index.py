@@ -0,0 +1,180 @@
+"""
+Utility functions for building the post index
+"""
+
+import os
+import re
+import json
+from datetime import datetime
+from typing import Any, Dict, List
+
+from blog_cli.utils.frontmatter import Post, parse_date
+from blog_cli.utils.manifest import write_if_changed
+from blog_cli.utils.pages import POST_PAGES_DIR
+
+# The full index (used by the build tools) and the paginated shards (used by readers)
+INDEX_FILE = 'post-index.json'
+SHARD_DIR = 'post-index'
+PAGE_SIZE = 50
+
+def make_index_entry(post: Post, base_filename: str, excerpt: str) -> Dict[str, Any]:
+    """
+    Build the post-index.json entry for a post.
+    
+    Args:
+        post: The parsed frontmatter of the post
+        base_filename: The post's filename without the .md extension
+        excerpt: The post's excerpt
+        
+    Returns:
+        Dictionary describing the post
+    """
+    return {
+        'filename': base_filename,
+        'title': post.title or base_filename.replace('-', ' '),
+        'date': post.date,
+        'categories': post.categories,
+        'tags': post.tags,
+        'image': post.image or '',
+        'excerpt': excerpt,
+        'html_filename': f"{base_filename}.html",
+        'url': f"{POST_PAGES_DIR}/{base_filename}.html"
+    }
+
+def sort_posts(posts: List[Dict[str, Any]]) -> None:
+    """
+    Sort index entries by date (newest first), breaking ties by filename.
+    
+    Args:
+        posts: Index entries, sorted in place
+    """
+    posts.sort(key=lambda post: post['filename'])
+    posts.sort(key=lambda post: (parse_date(post['date']) if post['date'] else None) or datetime.min, reverse=True)
+
+def slugify(text: str) -> str:
+    """
+    Turn a title or tag into a lowercase, dash-separated slug.
+    
+    Args:
+        text: The text to slugify
+        
+    Returns:
+        Slug string
+    """
+    slug = re.sub(r'[^a-z0-9]+', '-', text.lower())
+    return re.sub(r'(^-|-$)', '', slug)
+
+def listing_tags(post: Dict[str, Any]) -> List[str]:
+    """Return the tags a post is listed under on the blog page (its categories if it has no tags)."""
+    return post['tags'] or post['categories']
+
+def post_tags(post: Dict[str, Any]) -> List[str]:
+    """Return all of a post's tags and categories, without duplicates."""
+    return post['tags'] + [category for category in post['categories'] if category not in post['tags']]
+
+def tag_slugs(posts: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Assign a URL slug to every tag and category used by the posts.
+    
+    Args:
+        posts: Index entries
+        
+    Returns:
+        Mapping of tag to slug
+    """
+    slugs = {}
+    used_slugs = set()
+    for tag in sorted({tag for post in posts for tag in post_tags(post)}):
+        # Tags that slugify identically ("C++" and "c") get numbered slugs
+        base_slug = slug = slugify(tag) or 'tag'
+        suffix = 2
+        while slug in used_slugs:
+            slug = f"{base_slug}-{suffix}"
+            suffix += 1
+        used_slugs.add(slug)
+        slugs[tag] = slug
+    return slugs
+
+def _paginate(posts: List[Dict[str, Any]], page_size: int) -> List[List[Dict[str, Any]]]:
+    """Split posts into pages of page_size (always at least one, possibly empty, page)."""
+    return [posts[i:i + page_size] for i in range(0, len(posts), page_size)] or [[]]
+
+def write_index_shards(posts: List[Dict[str, Any]], shard_dir: str = SHARD_DIR,
+                       page_size: int = PAGE_SIZE) -> List[str]:
+    """
+    Write the paginated index read by the blog page.
+    
+    Writes a small manifest.json (post and page counts, and for each tag its
+    slug, post count and page count), page-N.json shards of page_size posts
+    each (newest first), and the same pagination for every tag under
+    tags/<slug>/. A reader only ever downloads the manifest and one shard, no
+    matter how large the archive grows. Unchanged shards are not rewritten and
+    shards that no longer exist are removed.
+    
+    Args:
+        posts: Index entries, already sorted newest first
+        shard_dir: Directory the shards are written to
+        page_size: Number of posts per shard
+        
+    Returns:
+        Paths of the files that were written or removed
+    """
+    files: Dict[str, Any] = {}
+    
+    pages = _paginate(posts, page_size)
+    for number, page in enumerate(pages, 1):
+        files[f"page-{number}.json"] = page
+    
+    by_tag: Dict[str, List[Dict[str, Any]]] = {}
+    for post in posts:
+        for tag in listing_tags(post):
+            by_tag.setdefault(tag, []).append(post)
+    
+    tags = {}
+    slugs = tag_slugs(posts)
+    for tag in sorted(by_tag):
+        slug = slugs[tag]
+        tag_pages = _paginate(by_tag[tag], page_size)
+        for number, page in enumerate(tag_pages, 1):
+            files[f"tags/{slug}/page-{number}.json"] = page
+        tags[tag] = {'slug': slug, 'count': len(by_tag[tag]), 'pages': len(tag_pages)}
+    
+    files['manifest.json'] = {
+        'version': 1,
+        'page_size': page_size,
+        'total': len(posts),
+        'pages': len(pages),
+        'tags': tags,
+    }
+    
+    changed = []
+    for name, data in files.items():
+        path = os.path.join(shard_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if write_if_changed(path, json.dumps(data, separators=(',', ':'))):
+            changed.append(path)
+    
+    # Remove shards left over from pages or tags that no longer exist
+    for dirpath, _, filenames in os.walk(shard_dir, topdown=False):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if os.path.relpath(path, shard_dir).replace(os.sep, '/') not in files:
+                os.remove(path)
+                changed.append(path)
+        if dirpath != shard_dir and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+    
+    return changed
+
+def write_index(posts: List[Dict[str, Any]]) -> bool:
+    """
+    Write post-index.json and its shards.
+    
+    Args:
+        posts: Index entries, already sorted newest first
+        
+    Returns:
+        True if anything was written
+    """
+    changed = write_if_changed(INDEX_FILE, json.dumps(posts, indent=2))
+    return bool(write_index_shards(posts)) or changed
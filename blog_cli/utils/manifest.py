@@ -0,0 +1,246 @@
+"""
+Persistent build manifest used to skip unchanged posts between builds
+"""
+
+import os
+import json
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional
+
+# Directory holding build caches (manifest, derived assets bookkeeping, ...)
+CACHE_DIR = '.blog-cache'
+MANIFEST_FILENAME = 'build-manifest.json'
+MANIFEST_VERSION = 1
+
+def hash_bytes(data: bytes) -> str:
+    """
+    Return the hex SHA-256 digest of some bytes.
+
+    Args:
+        data: The bytes to hash
+
+    Returns:
+        Hex digest string
+    """
+    return hashlib.sha256(data).hexdigest()
+
+def options_fingerprint(options: Any) -> str:
+    """
+    Return a stable fingerprint for a JSON-serialisable set of render options.
+
+    Args:
+        options: Render options (extensions, flags, template versions, ...)
+
+    Returns:
+        Hex digest string
+    """
+    return hash_bytes(json.dumps(options, sort_keys=True).encode('utf-8'))
+
+class BuildManifest:
+    """
+    Map of source file -> content hash, render options and output.
+
+    Each entry records the source's size and mtime so that unchanged files can
+    be skipped with a single ``stat`` call, the SHA-256 of its content so that
+    touched-but-identical files are not re-rendered, the fingerprint of the
+    options it was rendered with, the output path and the post's index entry.
+    """
+
+    def __init__(self, path: str, options: Any = None):
+        self.path = path
+        self.options = options_fingerprint(options)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # Build-wide state, e.g. hashes of templates shared by every page
+        self.meta: Dict[str, Any] = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: str, options: Any = None) -> 'BuildManifest':
+        """
+        Load a manifest from disk, returning an empty one if it is missing or unreadable.
+
+        Args:
+            path: Path to the manifest JSON file
+            options: The render options of the current build
+
+        Returns:
+            BuildManifest instance
+        """
+        manifest = cls(path, options)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+
+        if data.get('version') == MANIFEST_VERSION:
+            manifest.entries = data.get('entries', {})
+            manifest.meta = data.get('meta', {})
+        return manifest
+
+    def lookup(self, source: str, st: os.stat_result) -> Optional[Dict[str, Any]]:
+        """
+        Return the entry for a source if its size and mtime are unchanged.
+
+        Args:
+            source: Source path relative to the site root
+            st: Result of ``os.stat`` on the source
+
+        Returns:
+            The manifest entry, or None if the source must be inspected
+        """
+        entry = self.entries.get(source)
+        if entry is None:
+            return None
+        if entry.get('size') != st.st_size or entry.get('mtime_ns') != st.st_mtime_ns:
+            return None
+        return entry
+
+    def is_fresh(self, entry: Optional[Dict[str, Any]], digest: Optional[str] = None) -> bool:
+        """
+        Check whether an entry's output can be reused as-is.
+
+        Args:
+            entry: A manifest entry (or None)
+            digest: Content hash of the source, if it had to be re-read
+
+        Returns:
+            True if the recorded output is up to date
+        """
+        if entry is None:
+            return False
+        if digest is not None and entry.get('hash') != digest:
+            return False
+        if entry.get('options') != self.options:
+            return False
+        output = entry.get('output')
+        return bool(output) and os.path.exists(output)
+
+    def touch(self, source: str, st: os.stat_result) -> None:
+        """Refresh the recorded size and mtime of an entry whose content did not change."""
+        entry = self.entries[source]
+        entry['size'] = st.st_size
+        entry['mtime_ns'] = st.st_mtime_ns
+        self.dirty = True
+
+    def record(self, source: str, st: os.stat_result, digest: str, output: str,
+               index: Optional[Dict[str, Any]] = None, **extra: Any) -> None:
+        """
+        Record a freshly rendered source.
+
+        Args:
+            source: Source path relative to the site root
+            st: Result of ``os.stat`` on the source
+            digest: Content hash of the source
+            output: Path of the rendered output
+            index: The post's entry for post-index.json, if the source is a post
+            **extra: Other per-post build products to keep (e.g. search terms)
+        """
+        self.entries[source] = {
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'hash': digest,
+            'options': self.options,
+            'output': output,
+            'index': index,
+            **extra,
+        }
+        self.dirty = True
+
+    def prune(self, seen: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        Drop entries whose source no longer exists.
+
+        Args:
+            seen: Sources found during this build
+
+        Returns:
+            The removed entries
+        """
+        seen = set(seen)
+        removed = [source for source in self.entries if source not in seen]
+        if removed:
+            self.dirty = True
+        return [self.entries.pop(source) for source in removed]
+
+    def set_meta(self, key: str, value: Any) -> bool:
+        """
+        Update a build-wide value.
+
+        Args:
+            key: Name of the value
+            value: New (JSON-serialisable) value
+
+        Returns:
+            True if the value changed
+        """
+        if self.meta.get(key) == value:
+            return False
+        self.meta[key] = value
+        self.dirty = True
+        return True
+
+    def index_entries(self) -> List[Dict[str, Any]]:
+        """Return the index entries of every post in the manifest."""
+        return [entry['index'] for entry in self.entries.values()]
+
+    def save(self) -> None:
+        """Write the manifest to disk if anything changed."""
+        if not self.dirty:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'entries': self.entries, 'meta': self.meta}, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+def write_if_changed(path: str, content: str) -> bool:
+    """
+    Write text to a file unless it already has exactly that content.
+
+    Args:
+        path: Destination path
+        content: Text to write
+
+    Returns:
+        True if the file was written
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
+
+def store_blob(data: bytes, ext: str, directory: str, length: int = 16) -> str:
+    """
+    Write bytes to a directory under a name derived from their hash.
+
+    Identical content is only written once, so callers can store freely.
+
+    Args:
+        data: The content
+        ext: File extension, including the dot
+        directory: Destination directory
+        length: Number of hex digits of the hash used in the name
+
+    Returns:
+        Filename of the stored content
+    """
+    name = f"{hash_bytes(data)[:length]}{ext}"
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        # Atomic, as parallel workers may store the same content
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return name
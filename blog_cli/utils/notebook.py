@@ -0,0 +1,416 @@
+"""
+In-process conversion of Jupyter notebooks to markdown posts
+"""
+
+import os
+import re
+import json
+import base64
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from blog_cli.utils.frontmatter import update_frontmatter
+from blog_cli.utils.images import existing_images, extract_data_uris, save_image
+from blog_cli.utils.manifest import CACHE_DIR, MANIFEST_FILENAME, BuildManifest, store_blob
+from blog_cli.utils.profile import Profiler
+
+# Richest representation first; only one is kept per output, as nbconvert does
+OUTPUT_PRIORITY = (
+    'image/png', 'image/jpeg', 'image/gif', 'image/svg+xml',
+    'text/html', 'text/markdown', 'text/latex', 'text/plain',
+)
+IMAGE_TYPES = {
+    'image/png': '.png',
+    'image/jpeg': '.jpg',
+    'image/gif': '.gif',
+    'image/svg+xml': '.svg',
+}
+
+# Bump when the markdown produced for a notebook changes, so batch conversion
+# does not skip notebooks converted by an older version
+CONVERTER_VERSION = 3
+
+# Default output budgets: text outputs longer than MAX_OUTPUT_LINES collapse to
+# their first and last lines, very long lines are clipped, and once a post
+# shows MAX_POST_OUTPUT characters of output the remaining outputs are only
+# linked. Full outputs are stored (by content hash) in LOG_DIR.
+MAX_OUTPUT_LINES = 40
+MAX_LINE_CHARS = 400
+MAX_POST_OUTPUT = 20000
+LOG_DIR = 'assets/logs'
+
+# Terminal colour codes in tracebacks and progress output
+ANSI_RE = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+ATTACHMENT_RE = re.compile(r'attachment:([^)\s"\']+)')
+
+# Called with decoded image bytes and a file extension; returns the URL to reference
+SaveImage = Callable[[bytes, str], str]
+# Called with the full text of an output; returns the URL to reference
+SaveLog = Callable[[str], str]
+
+def join_source(source: Any) -> str:
+    """Return a notebook text field, which may be a string or a list of lines, as a string."""
+    return ''.join(source) if isinstance(source, list) else (source or '')
+
+def fence(text: str, lang: str = '') -> str:
+    """
+    Wrap text in a fenced code block.
+
+    The fence is made longer than any run of backticks in the text, so the
+    block cannot be closed early.
+
+    Args:
+        text: Contents of the block
+        lang: Language of the block, if any
+
+    Returns:
+        Markdown string
+    """
+    longest = max((len(run) for run in re.findall(r'`{3,}', text)), default=2)
+    marker = '`' * (longest + 1)
+    return f"{marker}{lang}\n{text.rstrip()}\n{marker}"
+
+class OutputBudget:
+    """Limits on how much text output a post shows inline (0 means no limit)."""
+
+    def __init__(self, max_lines: int = MAX_OUTPUT_LINES, max_post_chars: int = MAX_POST_OUTPUT,
+                 max_line_chars: int = MAX_LINE_CHARS):
+        self.max_lines = max_lines
+        self.max_post_chars = max_post_chars
+        self.max_line_chars = max_line_chars
+        # Characters of output shown so far in this post
+        self.used = 0
+
+    def options(self) -> List[int]:
+        """Return the limits, e.g. to fingerprint conversions made with them."""
+        return [self.max_lines, self.max_post_chars, self.max_line_chars]
+
+    def render(self, text: str, save_log: SaveLog) -> str:
+        """
+        Render a text output within the budget.
+
+        Args:
+            text: The full output
+            save_log: Function storing the full output and returning its URL
+
+        Returns:
+            Markdown string: a fenced block, followed by a link to the full
+            output if anything was left out, or only the link once the
+            post's budget is spent
+        """
+        lines = text.rstrip('\n').split('\n')
+        if self.max_post_chars and self.used >= self.max_post_chars:
+            return f"[Output: {len(lines)} lines]({save_log(text)})"
+
+        shown = lines
+        if self.max_lines and len(lines) > self.max_lines:
+            head = self.max_lines // 2
+            tail = self.max_lines - head
+            shown = lines[:head] + [f"... ({len(lines) - head - tail} lines omitted) ..."] + lines[-tail:]
+        if self.max_line_chars:
+            shown = [line if len(line) <= self.max_line_chars else line[:self.max_line_chars] + ' ...'
+                     for line in shown]
+
+        body = '\n'.join(shown)
+        self.used += len(body)
+        if shown == lines:
+            return fence(body)
+        return f"{fence(body)}\n\n[Full output ({len(lines)} lines)]({save_log(text)})"
+
+def notebook_language(notebook_json: Dict[str, Any]) -> str:
+    """Return the language of a notebook's code cells (python unless the metadata says otherwise)."""
+    metadata = notebook_json.get('metadata', {})
+    return (metadata.get('language_info', {}).get('name')
+            or metadata.get('kernelspec', {}).get('language')
+            or 'python')
+
+def decode_image(data: Any, mime: str) -> bytes:
+    """Decode image data from a notebook: base64 for binary formats, plain text for SVG."""
+    text = join_source(data)
+    if mime == 'image/svg+xml':
+        return text.encode('utf-8')
+    return base64.b64decode(text)
+
+def convert_output(output: Dict[str, Any], save_image: SaveImage,
+                   render_text: Callable[[str], str] = fence) -> Optional[str]:
+    """
+    Convert a code cell output to markdown.
+
+    Args:
+        output: The output from the notebook JSON
+        save_image: Function storing an image and returning its URL
+        render_text: Function rendering text output (a fenced block by default)
+
+    Returns:
+        Markdown string, or None if there is nothing to show
+    """
+    output_type = output.get('output_type')
+    if output_type == 'stream':
+        text = ANSI_RE.sub('', join_source(output.get('text')))
+        return render_text(text) if text.strip() else None
+
+    if output_type == 'error':
+        return render_text(ANSI_RE.sub('', '\n'.join(output.get('traceback', []))))
+
+    data = output.get('data', {})
+    for mime in OUTPUT_PRIORITY:
+        if mime not in data:
+            continue
+        if mime in IMAGE_TYPES:
+            alt = IMAGE_TYPES[mime].lstrip('.')
+            return f"![{alt}]({save_image(decode_image(data[mime], mime), IMAGE_TYPES[mime])})"
+        text = join_source(data[mime])
+        if mime == 'text/plain':
+            return render_text(ANSI_RE.sub('', text))
+        # HTML, markdown and LaTeX are passed through as-is
+        return text.strip()
+    return None
+
+def convert_markdown_cell(cell: Dict[str, Any], save_image: SaveImage) -> str:
+    """Return a markdown cell's source, with attached images moved to the image store."""
+    source = join_source(cell.get('source'))
+    attachments = cell.get('attachments', {})
+
+    def replace(match):
+        bundle = attachments.get(match.group(1), {})
+        for mime, ext in IMAGE_TYPES.items():
+            if mime in bundle:
+                return save_image(decode_image(bundle[mime], mime), ext)
+        return match.group(0)
+
+    return ATTACHMENT_RE.sub(replace, source) if attachments else source
+
+def extract_notebook_metadata(notebook_json: Dict[str, Any], notebook_filename: str) -> Dict[str, Any]:
+    """
+    Extract post metadata from a notebook.
+
+    The date comes from a YYYY-MM-DD filename prefix (default: today), the
+    title from the first heading, and categories and image from
+    fastpages-style "- categories: [...]" / "- image: ..." lines.
+
+    Args:
+        notebook_json: The parsed .ipynb file
+        notebook_filename: Name of the notebook file
+
+    Returns:
+        Dictionary with title, date, categories and image
+    """
+    title = ""
+    categories = []
+    image = None
+    date = None
+
+    # Try to extract date from filename (format: YYYY-MM-DD-title.ipynb)
+    date_match = re.match(r'(\d{4}-\d{2}-\d{2})', notebook_filename)
+    if date_match:
+        date_str = date_match.group(1)
+        try:
+            date = datetime.strptime(date_str, '%Y-%m-%d').strftime('%B %d, %Y')
+        except ValueError:
+            pass
+
+    # If no date in filename, use current date
+    if not date:
+        date = datetime.now().strftime('%B %d, %Y')
+
+    # Look for metadata in the first markdown cell
+    for cell in notebook_json['cells']:
+        if cell['cell_type'] == 'markdown':
+            content = join_source(cell['source'])
+
+            # Extract title from first heading
+            title_match = re.search(r'# (.*?)$', content, re.MULTILINE)
+            if title_match and not title:
+                title = title_match.group(1).strip()
+
+            # Look for fastpages-style metadata
+            categories_match = re.search(r'- categories: \[(.*?)\]', content)
+            if categories_match:
+                categories = [cat.strip() for cat in categories_match.group(1).split(',')]
+
+            image_match = re.search(r'- image: (.*?)$', content, re.MULTILINE)
+            if image_match:
+                image = image_match.group(1).strip()
+
+            # If we found all metadata, break
+            if title and categories and image:
+                break
+
+    # If no title found, use the notebook filename
+    if not title:
+        title = notebook_filename.replace('.ipynb', '').replace('-', ' ').title()
+
+    return {
+        'title': title,
+        'date': date,
+        'categories': categories,
+        'image': image
+    }
+
+def post_filename(notebook_filename: str, title: str, output: Optional[str] = None) -> str:
+    """
+    Return the filename of the post made from a notebook.
+
+    Args:
+        notebook_filename: Name of the notebook file
+        title: Title of the post
+        output: Filename requested by the user, if any
+
+    Returns:
+        Filename of the post, "<date>-<slug>.md" by default
+    """
+    if output:
+        return output if output.endswith('.md') else f"{output}.md"
+
+    # Extract date from original filename or use today's date
+    date_match = re.match(r'(\d{4}-\d{2}-\d{2})', notebook_filename)
+    date_prefix = date_match.group(1) if date_match else datetime.now().strftime('%Y-%m-%d')
+
+    # Create slug from title
+    slug = re.sub(r'[^a-z0-9]+', '-', title.lower())
+    slug = re.sub(r'(^-|-$)', '', slug)
+
+    return f"{date_prefix}-{slug}.md"
+
+def image_saver(posts_dir: str, existing: Optional[Dict[str, str]] = None) -> SaveImage:
+    """
+    Return a SaveImage function storing images in <posts_dir>/images, referenced as /posts/images/<name>.
+
+    With ``existing`` (see existing_images), an image already in the directory
+    is referenced under its own name rather than copied to a hash-named file.
+    """
+    images_dir = os.path.join(posts_dir, 'images')
+    return lambda data, ext: f"/posts/images/{save_image(data, ext, images_dir, existing)}"
+
+def known_images(posts_dir: str) -> Dict[str, str]:
+    """
+    Map content-hash names to the images already in <posts_dir>/images.
+
+    Only images the last build did not record (or that changed since) are
+    read, so a command can call this once and share the result.
+    """
+    manifest = BuildManifest.load(os.path.join(CACHE_DIR, MANIFEST_FILENAME))
+    return existing_images(os.path.join(posts_dir, 'images'), manifest.meta.get('images'))
+
+def log_saver(site_root: str) -> SaveLog:
+    """Return a SaveLog function storing full outputs in <site_root>/assets/logs."""
+    logs_dir = os.path.join(site_root, LOG_DIR)
+    return lambda text: f"/{LOG_DIR}/{store_blob(text.encode('utf-8'), '.txt', logs_dir)}"
+
+def convert_notebook(notebook_json: Dict[str, Any], save_image: SaveImage,
+                     save_log: Optional[SaveLog] = None, budget: Optional[OutputBudget] = None,
+                     profiler: Optional[Profiler] = None) -> str:
+    """
+    Convert a notebook to markdown without running Jupyter.
+
+    Markdown cells are copied as-is, code cells become fenced blocks in the
+    notebook's language, and each output is rendered in its richest format:
+    images are decoded and handed to ``save_image``, text becomes a fenced
+    block, HTML and markdown are passed through. Data-URI images embedded in
+    markdown cells or HTML outputs are handed to ``save_image`` as well.
+
+    With ``save_log``, text outputs are kept within ``budget`` (the default
+    OutputBudget if not given), and the full text of anything shortened is
+    handed to ``save_log`` and linked.
+
+    Args:
+        notebook_json: The parsed .ipynb file
+        save_image: Function storing an image and returning the URL to reference
+        save_log: Function storing a full output and returning the URL to reference
+        budget: Output limits for this post
+        profiler: Records the conversion of each cell
+
+    Returns:
+        Markdown string
+    """
+    profiler = profiler or Profiler(enabled=False)
+    language = notebook_language(notebook_json)
+    render_text = fence
+    if save_log is not None:
+        budget = budget or OutputBudget()
+        render_text = lambda text: budget.render(text, save_log)
+    blocks: List[str] = []
+
+    for number, cell in enumerate(notebook_json.get('cells', []), 1):
+        cell_type = cell.get('cell_type')
+        profiler.begin(f"cell {number} ({cell_type})", 'cell')
+        if cell_type == 'markdown':
+            blocks.append(convert_markdown_cell(cell, save_image))
+        elif cell_type == 'code':
+            source = join_source(cell.get('source'))
+            if source.strip():
+                blocks.append(fence(source, language))
+            for output in cell.get('outputs', []):
+                converted = convert_output(output, save_image, render_text)
+                if converted:
+                    blocks.append(converted)
+        elif cell_type == 'raw':
+            blocks.append(join_source(cell.get('source')))
+        profiler.end()
+
+    markdown = '\n\n'.join(block.strip('\n') for block in blocks if block.strip()) + '\n'
+    return extract_data_uris(markdown, save_image)[0]
+
+def notebook_to_post(notebook_path: str, posts_dir: str, output: Optional[str] = None,
+                     budget: Optional[OutputBudget] = None, profiler: Optional[Profiler] = None,
+                     existing: Optional[Dict[str, str]] = None) -> Tuple[str, str]:
+    """
+    Convert a notebook file to the filename and content of its post, without writing the post.
+
+    Images are saved to posts_dir/images and full versions of shortened
+    outputs to assets/logs next to posts_dir.
+
+    Args:
+        notebook_path: Path to the .ipynb file
+        posts_dir: Directory the post's images (in images/) are written to
+        output: Filename of the post, if not derived from the notebook
+        budget: Output limits for the post
+        profiler: Records the load and convert phases and each cell
+        existing: Images already in posts_dir/images (see known_images), which
+            are referenced instead of copied
+
+    Returns:
+        Tuple of (post filename, post content)
+    """
+    profiler = profiler or Profiler(enabled=False)
+    profiler.phase('load')
+    with open(notebook_path, 'r', encoding='utf-8') as f:
+        notebook_json = json.load(f)
+
+    notebook_filename = os.path.basename(notebook_path)
+    metadata = extract_notebook_metadata(notebook_json, notebook_filename)
+
+    profiler.phase('convert')
+    site_root = os.path.dirname(os.path.abspath(posts_dir))
+    markdown = convert_notebook(notebook_json, image_saver(posts_dir, existing), log_saver(site_root), budget, profiler)
+    content = update_frontmatter(markdown, metadata)
+    return post_filename(notebook_filename, metadata['title'], output), content
+
+def convert_notebook_file(notebook_path: str, posts_dir: str, output: Optional[str] = None,
+                          budget: Optional[OutputBudget] = None, profiler: Optional[Profiler] = None,
+                          existing: Optional[Dict[str, str]] = None) -> str:
+    """
+    Convert a notebook file to a post in posts_dir, writing the post once.
+
+    Full versions of shortened outputs go to assets/logs next to posts_dir.
+
+    Args:
+        notebook_path: Path to the .ipynb file
+        posts_dir: Directory the post (and its images, in images/) is written to
+        output: Filename of the post, if not derived from the notebook
+        budget: Output limits for the post
+        profiler: Records the load, convert and write phases and each cell
+        existing: Images already in posts_dir/images (see known_images), which
+            are referenced instead of copied
+
+    Returns:
+        Path of the post
+    """
+    profiler = profiler or Profiler(enabled=False)
+    filename, content = notebook_to_post(notebook_path, posts_dir, output, budget, profiler, existing)
+
+    profiler.phase('write')
+    post_path = os.path.join(posts_dir, filename)
+    with open(post_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return post_path
@@ -0,0 +1,72 @@
+"""
+Utility functions for rendering complete post pages at build time
+"""
+
+import re
+from html import escape
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+# Template the post pages are rendered from, and where they are written
+POST_TEMPLATE = 'templates/post.html'
+POST_PAGES_DIR = 'blog'
+# Static listing pages and feeds, one directory per tag or category
+TAG_PAGES_DIR = 'tags'
+
+# Blocks of the template that only matter when a post is assembled in the browser
+CLIENT_RENDER_RE = re.compile(r'[ \t]*<!-- client-render:start -->.*?<!-- client-render:end -->\n?', re.DOTALL)
+
+def prepare_post_template(template: str) -> str:
+    """
+    Strip the client-side rendering blocks from the post template.
+
+    Args:
+        template: Contents of templates/post.html
+
+    Returns:
+        Template used for pages rendered at build time
+    """
+    return CLIENT_RENDER_RE.sub('', template)
+
+def render_tags(tags: List[str], slugs: Optional[Dict[str, str]] = None) -> str:
+    """
+    Render the tag links shown under a post's title.
+
+    Args:
+        tags: The post's tags
+        slugs: Slugs of the static tag pages; tags without one link to the
+            filtered blog listing instead
+
+    Returns:
+        HTML string
+    """
+    slugs = slugs or {}
+    return ''.join(
+        f'<a href="../{TAG_PAGES_DIR}/{slugs[tag]}/" class="post-tag">{escape(tag)}</a>' if tag in slugs
+        else f'<a href="../blog.html?tag={quote(tag)}" class="post-tag">{escape(tag)}</a>'
+        for tag in tags
+    )
+
+def post_page_values(post_data: Dict[str, Any], html_content: str,
+                     slugs: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Return the placeholder values of a post's page.
+
+    Args:
+        post_data: The post's index entry
+        html_content: The rendered post body
+        slugs: Slugs of the static tag pages
+
+    Returns:
+        HTML to insert for each placeholder of the post template
+    """
+    return {
+        'title': escape(post_data['title']),
+        'date': escape(post_data['date']),
+        'tags': render_tags(post_data['tags'], slugs),
+        'content': html_content,
+    }
+
+def post_page_path(post_data: Dict[str, Any]) -> str:
+    """Return the path a post's page is written to, relative to the site root."""
+    return f"{POST_PAGES_DIR}/{post_data['html_filename']}"
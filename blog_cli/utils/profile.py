@@ -0,0 +1,249 @@
+"""
+Utility functions for profiling builds and writing Chrome trace files
+"""
+
+import os
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from blog_cli.utils.manifest import CACHE_DIR
+
+# Written by --profile; open it in chrome://tracing or https://ui.perfetto.dev
+TRACE_FILE = os.path.join(CACHE_DIR, 'trace.json')
+
+# Number of posts listed in the slowest-posts table
+TOP_POSTS = 10
+
+def io_counters() -> Tuple[int, int]:
+    """Return the bytes read and written by this process so far ((0, 0) where /proc/self/io is unavailable)."""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(fields['rchar']), int(fields['wchar'])
+    except (OSError, KeyError, ValueError):
+        return 0, 0
+
+class Profiler:
+    """
+    Records spans of a command (its phases and the posts within them) with
+    their wall time, CPU time, bytes read and written and allocation peak,
+    and writes them as a Chrome trace.
+
+    A disabled profiler records nothing, so build code can call it
+    unconditionally. Allocation peaks come from tracemalloc, which slows the
+    build down noticeably; compare wall times between profiled runs only.
+    """
+
+    def __init__(self, enabled: bool = True, name: str = 'build', origin: Optional[float] = None):
+        """
+        Args:
+            enabled: Whether anything is recorded
+            name: Name of the root span, covering the whole command
+            origin: perf_counter() value trace timestamps are relative to;
+                worker processes pass the parent's so their spans line up
+        """
+        self.enabled = enabled
+        self.name = name
+        self.origin = time.perf_counter() if origin is None else origin
+        self.spans: List[Dict[str, Any]] = []
+        self._open: List[Dict[str, Any]] = []
+        self._phase: Optional[Dict[str, Any]] = None
+        self._tracing = False
+
+    def __enter__(self) -> 'Profiler':
+        if self.enabled:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._tracing = True
+            self.begin(self.name, 'command')
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.enabled:
+            while self._open:
+                self.end()
+            if self._tracing:
+                tracemalloc.stop()
+                self._tracing = False
+
+    def _fold_peak(self) -> None:
+        """Fold the allocation peak since the last reset into every open span."""
+        peak = tracemalloc.get_traced_memory()[1]
+        for span in self._open:
+            span['peak'] = max(span['peak'], peak)
+        # Without reset_peak (Python < 3.9) peaks are process-wide and only ever grow
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+
+    def begin(self, name: str, category: str = 'phase', **args: Any) -> None:
+        """
+        Open a span; spans nest, and are closed in reverse order with end().
+
+        Args:
+            name: Name of the span (a phase, or the path of a post)
+            category: 'command', 'phase', 'post' or 'cell'
+            **args: Extra values shown with the span in the trace viewer
+        """
+        if not self.enabled:
+            return
+        if tracemalloc.is_tracing():
+            self._fold_peak()
+        read, written = io_counters()
+        memory = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        self._open.append({
+            'name': name, 'cat': category, 'args': args,
+            'start': time.perf_counter(), 'cpu': time.process_time(),
+            'read': read, 'written': written, 'memory': memory, 'peak': memory,
+        })
+
+    def end(self) -> Optional[Dict[str, Any]]:
+        """Close the innermost open span, returning its record (None when disabled)."""
+        if not self.enabled or not self._open:
+            return None
+        if tracemalloc.is_tracing():
+            self._fold_peak()
+        span = self._open.pop()
+        if span is self._phase:
+            self._phase = None
+        read, written = io_counters()
+        record = {
+            'name': span['name'],
+            'cat': span['cat'],
+            'start': span['start'] - self.origin,
+            'wall': time.perf_counter() - span['start'],
+            'cpu': time.process_time() - span['cpu'],
+            'read_bytes': read - span['read'],
+            'written_bytes': written - span['written'],
+            'alloc_peak_bytes': span['peak'] - span['memory'],
+            'pid': os.getpid(),
+            'args': span['args'],
+        }
+        self.spans.append(record)
+        return record
+
+    def phase(self, name: str, **args: Any) -> None:
+        """
+        Start the next phase of a linear pipeline, ending the previous one.
+
+        Args:
+            name: Name of the phase
+            **args: Extra values shown with the span in the trace viewer
+        """
+        if not self.enabled:
+            return
+        if self._phase is not None:
+            while self._open and self._open[-1] is not self._phase:
+                self.end()
+            self.end()
+        self.begin(name, 'phase', **args)
+        self._phase = self._open[-1]
+
+    def merge(self, spans: List[Dict[str, Any]]) -> None:
+        """Add the spans recorded by a worker process."""
+        self.spans.extend(spans)
+
+    def trace_events(self) -> List[Dict[str, Any]]:
+        """Return the spans as Chrome trace "complete" events."""
+        events = []
+        for pid in sorted({span['pid'] for span in self.spans}):
+            name = self.name if pid == os.getpid() else f"worker {pid}"
+            events.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': pid, 'args': {'name': name}})
+        for span in self.spans:
+            args = dict(span['args'])
+            args.update({
+                'cpu_ms': round(span['cpu'] * 1000, 3),
+                'read_bytes': span['read_bytes'],
+                'written_bytes': span['written_bytes'],
+                'alloc_peak_bytes': span['alloc_peak_bytes'],
+            })
+            events.append({
+                'name': span['name'], 'cat': span['cat'], 'ph': 'X',
+                'ts': round(span['start'] * 1e6, 1), 'dur': round(span['wall'] * 1e6, 1),
+                'pid': span['pid'], 'tid': span['pid'], 'args': args,
+            })
+        return events
+
+    def write_trace(self, path: str = TRACE_FILE) -> None:
+        """
+        Write the recorded spans as a Chrome trace (JSON object format).
+
+        Args:
+            path: Destination path
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, f)
+
+    def report(self, echo: Callable[[str], Any] = print, path: str = TRACE_FILE,
+               top: int = TOP_POSTS, category: str = 'post') -> None:
+        """
+        Write the trace and print the phase timings and the slowest posts.
+
+        Args:
+            echo: Function used to print the tables
+            path: Destination of the trace file
+            top: Number of rows in the slowest-posts table
+            category: Category of the spans ranked in that table ('cell'
+                for a single notebook)
+        """
+        if not self.enabled:
+            return
+        self.write_trace(path)
+
+        echo('')
+        echo(_table_header('Phase'))
+        for span in self.spans:
+            if span['cat'] in ('command', 'phase') and span['pid'] == os.getpid():
+                name = span['name'] if span['cat'] == 'phase' else f"total ({span['name']})"
+                echo(_table_row(name, span))
+
+        posts = sorted((span for span in self.spans if span['cat'] == category),
+                       key=lambda span: span['wall'], reverse=True)
+        if posts:
+            echo('')
+            echo(f"{_table_header(category.title())}  (slowest {min(top, len(posts))} of {len(posts)})")
+            for span in posts[:top]:
+                echo(_table_row(span['name'], span))
+        echo('')
+        echo(f"Wrote trace to {path} (open it in chrome://tracing or https://ui.perfetto.dev)")
+
+def _table_header(label: str) -> str:
+    """Return the header line of a report table."""
+    return f"{label:<32} {'wall ms':>9} {'cpu ms':>9} {'read KB':>9} {'written KB':>10} {'alloc KB':>9}"
+
+def _table_row(name: str, span: Dict[str, Any]) -> str:
+    """Return a report table line for a span, keeping the end of long names."""
+    if len(name) > 32:
+        name = '...' + name[-29:]
+    return (f"{name:<32} {span['wall'] * 1000:9.1f} {span['cpu'] * 1000:9.1f} "
+            f"{span['read_bytes'] / 1024:9.0f} {span['written_bytes'] / 1024:10.0f} "
+            f"{span['alloc_peak_bytes'] / 1024:9.0f}")
+
+def run_profiled(origin: float, name: str, func: Callable[..., Any], *args: Any) -> Tuple[Any, List[Dict[str, Any]]]:
+    """
+    Run a function in a worker process as a profiled post span.
+
+    Args:
+        origin: The parent profiler's origin, so both traces share one clock
+            (perf_counter is system-wide on Linux and macOS)
+        name: Name of the span
+        func: Function to run (must be picklable)
+        *args: Arguments passed to it
+
+    Returns:
+        Tuple of (the function's result, the recorded spans)
+    """
+    profiler = Profiler(origin=origin)
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        profiler.begin(name, 'post')
+        result = func(*args)
+        profiler.end()
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    return result, profiler.spans
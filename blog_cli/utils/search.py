@@ -0,0 +1,210 @@
+"""
+Utility functions for building the static full-text search index
+"""
+
+import os
+import re
+import json
+from html import unescape
+from typing import Any, Dict, Iterable, List, Optional
+
+from blog_cli.utils.manifest import write_if_changed
+
+SEARCH_DIR = 'search'
+SEARCH_VERSION = 1
+
+# Postings are sharded by the first PREFIX_LENGTH characters of each term, and
+# documents in groups of DOCS_PER_SHARD, so a query only loads what it needs
+PREFIX_LENGTH = 2
+DOCS_PER_SHARD = 256
+
+# The stopwords and suffix rules are published in search/manifest.json so that
+# the browser normalises queries exactly like the build normalised the posts
+STOPWORDS = frozenset('''
+a an and are as at be but by for from has have i if in into is it its of on or
+so that the their then there these this to was we were will with you your our
+'''.split())
+
+# First matching suffix wins, as long as at least MIN_STEM characters remain;
+# rules that map a suffix to itself protect endings like "ss" from later rules
+STEM_RULES = (
+    ('ational', 'ate'),
+    ('ization', 'ize'),
+    ('fulness', 'ful'),
+    ('ousness', 'ous'),
+    ('iveness', 'ive'),
+    ('ations', 'ate'),
+    ('ation', 'ate'),
+    ('ments', ''),
+    ('ment', ''),
+    ('ness', ''),
+    ('ings', ''),
+    ('ing', ''),
+    ('sses', 'ss'),
+    ('ies', 'y'),
+    ('ied', 'y'),
+    ('edly', ''),
+    ('ed', ''),
+    ('ly', ''),
+    ('ss', 'ss'),
+    ('us', 'us'),
+    ('is', 'is'),
+    ('es', ''),
+    ('s', ''),
+)
+MIN_STEM = 3
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+PRE_RE = re.compile(r'<pre\b.*?</pre>', re.DOTALL | re.IGNORECASE)
+TAG_RE = re.compile(r'<[^>]+>')
+
+def stem(word: str) -> str:
+    """
+    Reduce a word to its stem with a small set of suffix rules.
+
+    Args:
+        word: A lowercase token
+
+    Returns:
+        The stemmed token
+    """
+    for suffix, replacement in STEM_RULES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+            return word[:len(word) - len(suffix)] + replacement
+    return word
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into stemmed search terms, dropping stopwords and one-letter tokens.
+
+    Args:
+        text: Plain text
+
+    Returns:
+        List of terms (with repeats)
+    """
+    return [
+        stem(token) for token in TOKEN_RE.findall(text.lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+def html_to_text(html: str) -> str:
+    """
+    Extract the prose of a rendered post.
+
+    Code blocks (including notebook cell output) are dropped so the index is
+    not flooded with identifiers and log lines.
+
+    Args:
+        html: Rendered post HTML
+
+    Returns:
+        Plain text
+    """
+    return unescape(TAG_RE.sub(' ', PRE_RE.sub(' ', html)))
+
+def post_terms(post_data: Dict[str, Any], html: str) -> List[str]:
+    """
+    Return the sorted, de-duplicated search terms of a post.
+
+    Args:
+        post_data: The post's index entry
+        html: The rendered post HTML
+
+    Returns:
+        Sorted list of unique terms
+    """
+    text = ' '.join([post_data['title'], ' '.join(post_data['tags']),
+                     ' '.join(post_data['categories']), html_to_text(html)])
+    return sorted(set(tokenize(text)))
+
+def assign_doc_ids(filenames: Iterable[str], ids: Dict[str, int]) -> Dict[str, int]:
+    """
+    Give each post a stable document ID.
+
+    IDs of existing posts never change, so adding a post only touches the
+    shards its own terms live in.
+
+    Args:
+        filenames: Filenames of all current posts
+        ids: IDs assigned by previous builds
+
+    Returns:
+        Mapping of filename to ID for the current posts
+    """
+    next_id = max(ids.values(), default=-1) + 1
+    assigned = {}
+    for filename in sorted(filenames):
+        if filename in ids:
+            assigned[filename] = ids[filename]
+        else:
+            assigned[filename] = next_id
+            next_id += 1
+    return assigned
+
+def delta_encode(ids: List[int]) -> List[int]:
+    """Encode a sorted list of IDs as the first ID followed by successive gaps."""
+    return [ids[0]] + [b - a for a, b in zip(ids, ids[1:])] if ids else []
+
+def write_search_index(posts: List[Dict[str, Any]], terms: Dict[str, List[str]],
+                       ids: Dict[str, int], search_dir: str = SEARCH_DIR) -> List[str]:
+    """
+    Write the inverted index used by the search box on the blog page.
+
+    Files written:
+        manifest.json: tokenizer settings, shard sizes and document count
+        terms/<prefix>.json: term -> delta-encoded list of document IDs
+        docs/<n>.json: document ID -> title, date and URL (DOCS_PER_SHARD per file)
+
+    Unchanged files are not rewritten and stale ones are removed.
+
+    Args:
+        posts: Index entries of all posts
+        terms: Search terms of each post, keyed by filename
+        ids: Document ID of each post, keyed by filename
+        search_dir: Directory the index is written to
+
+    Returns:
+        Paths of the files that were written or removed
+    """
+    postings: Dict[str, List[int]] = {}
+    docs: Dict[int, List[Optional[Dict[str, str]]]] = {}
+
+    for post in posts:
+        doc_id = ids[post['filename']]
+        shard = docs.setdefault(doc_id // DOCS_PER_SHARD, [None] * DOCS_PER_SHARD)
+        shard[doc_id % DOCS_PER_SHARD] = {'title': post['title'], 'date': post['date'], 'url': post['url']}
+        for term in terms.get(post['filename'], []):
+            postings.setdefault(term, []).append(doc_id)
+
+    files: Dict[str, Any] = {}
+    for term in sorted(postings):
+        shard = files.setdefault(f"terms/{term[:PREFIX_LENGTH]}.json", {})
+        shard[term] = delta_encode(sorted(postings[term]))
+    for number, shard in docs.items():
+        files[f"docs/{number}.json"] = shard
+    files['manifest.json'] = {
+        'version': SEARCH_VERSION,
+        'documents': len(posts),
+        'prefix_length': PREFIX_LENGTH,
+        'docs_per_shard': DOCS_PER_SHARD,
+        'min_stem': MIN_STEM,
+        'stem_rules': STEM_RULES,
+        'stopwords': sorted(STOPWORDS),
+    }
+
+    changed = []
+    for name, data in files.items():
+        path = os.path.join(search_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if write_if_changed(path, json.dumps(data, separators=(',', ':'))):
+            changed.append(path)
+
+    for dirpath, _, filenames in os.walk(search_dir):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if os.path.relpath(path, search_dir).replace(os.sep, '/') not in files:
+                os.remove(path)
+                changed.append(path)
+
+    return changed
@@ -0,0 +1,278 @@
+"""
+Local preview server with conditional requests, gzip variants and live reload
+"""
+
+import os
+import gzip
+import queue
+import mimetypes
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from typing import Callable, Optional, Set
+from urllib.parse import urlsplit
+
+from blog_cli.utils.images import IMAGE_STORE_DIR
+from blog_cli.utils.manifest import CACHE_DIR
+
+# Served with gzip when the client accepts it
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'application/xml',
+    'application/rss+xml', 'image/svg+xml',
+)
+
+# Open pages listen on this endpoint and reload when a rebuild finishes
+LIVE_RELOAD_PATH = '/__livereload'
+LIVE_RELOAD_SCRIPT = (
+    f"<script>new EventSource('{LIVE_RELOAD_PATH}').onmessage = function() {{ location.reload(); }};</script>"
+)
+KEEPALIVE_SECONDS = 15
+
+# Content-addressed files never change, so they can be cached like in production
+IMMUTABLE_PREFIXES = ('/' + IMAGE_STORE_DIR + '/',)
+
+def guess_type(path: str) -> str:
+    """Return the content type a file is served with."""
+    return mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+def is_compressible(ctype: str) -> bool:
+    """Check whether a content type is worth compressing."""
+    return ctype.startswith(COMPRESSIBLE_TYPES)
+
+def inject_live_reload(data: bytes) -> bytes:
+    """Insert the live reload script before the closing </body> tag of a page."""
+    index = data.rfind(b'</body>')
+    if index < 0:
+        return data + LIVE_RELOAD_SCRIPT.encode('utf-8')
+    return data[:index] + LIVE_RELOAD_SCRIPT.encode('utf-8') + b'\n' + data[index:]
+
+class GzipCache:
+    """
+    Gzip-compressed copies of the site's text files.
+
+    Each variant is given its source's mtime, so a variant is current exactly
+    when the two mtimes match and can be checked with a ``stat`` call.
+    """
+
+    def __init__(self, root: str, cache_dir: str, transform: Optional[Callable[[bytes], bytes]] = None):
+        self.root = root
+        self.cache_dir = cache_dir
+        # Applied to HTML before compressing (e.g. to inject the live reload script)
+        self.transform = transform
+
+    def variant(self, path: str, st: os.stat_result, html: bool = False) -> str:
+        """
+        Return the path of a file's gzip variant, (re)building it if needed.
+
+        Args:
+            path: Absolute path of the file
+            st: Result of ``os.stat`` on the file
+            html: Whether the transform applies to the file
+
+        Returns:
+            Path of the compressed variant
+        """
+        gz_path = os.path.join(self.cache_dir, os.path.relpath(path, self.root) + '.gz')
+        try:
+            if os.stat(gz_path).st_mtime_ns == st.st_mtime_ns:
+                return gz_path
+        except OSError:
+            pass
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        if html and self.transform is not None:
+            data = self.transform(data)
+
+        os.makedirs(os.path.dirname(gz_path), exist_ok=True)
+        tmp_path = f"{gz_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp_path, gz_path)
+        return gz_path
+
+    def prebuild(self) -> int:
+        """
+        Build the gzip variants of every compressible file in the site.
+
+        Returns:
+            Number of compressible files
+        """
+        count = 0
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.') and d != '__pycache__']
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                ctype = guess_type(path)
+                if filename.startswith('.') or not is_compressible(ctype):
+                    continue
+                self.variant(path, os.stat(path), ctype == 'text/html')
+                count += 1
+        return count
+
+class PreviewRequestHandler(SimpleHTTPRequestHandler):
+    """Serves the site with ETag/Last-Modified validation, gzip and live reload."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if urlsplit(self.path).path == LIVE_RELOAD_PATH and self.server.live_reload:
+            self.send_events()
+            return
+        super().do_GET()
+
+    def guess_type(self, path):
+        return guess_type(path)
+
+    def send_head(self):
+        url_path = urlsplit(self.path).path
+        path = self.translate_path(self.path)
+
+        # Hidden files and directories (.git, .blog-cache, ...) are not part of the site.
+        # Checked on the decoded filesystem path, so /%2egit/config is caught too.
+        relative = os.path.relpath(path, self.directory)
+        if relative != os.curdir and any(part.startswith('.') for part in relative.split(os.sep)):
+            self.send_error(HTTPStatus.NOT_FOUND, 'File not found')
+            return None
+
+        if os.path.isdir(path):
+            index = os.path.join(path, 'index.html')
+            if not url_path.endswith('/') or not os.path.exists(index):
+                # Redirects and directory listings are left to the base class
+                return super().send_head()
+            path = index
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, 'File not found')
+            return None
+
+        ctype = self.guess_type(path)
+        html = ctype == 'text/html'
+        inject = html and self.server.live_reload
+        compressible = is_compressible(ctype)
+        gzipped = compressible and 'gzip' in self.headers.get('Accept-Encoding', '')
+        # Each representation (live reload script, gzip) gets its own validator
+        suffix = ('-lr' if inject else '') + ('-gz' if gzipped else '')
+        etag = f'"{st.st_size:x}-{st.st_mtime_ns:x}{suffix}"'
+        last_modified = formatdate(st.st_mtime, usegmt=True)
+        if url_path.startswith(IMMUTABLE_PREFIXES):
+            cache_control = 'public, max-age=31536000, immutable'
+        else:
+            cache_control = 'no-cache'
+
+        if self.not_modified(etag, st):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', last_modified)
+            self.send_header('Cache-Control', cache_control)
+            self.end_headers()
+            return None
+
+        if gzipped:
+            body = open(self.server.gzip_cache.variant(path, st, html), 'rb')
+            length = os.fstat(body.fileno()).st_size
+        elif inject:
+            with open(path, 'rb') as f:
+                data = inject_live_reload(f.read())
+            body = BytesIO(data)
+            length = len(data)
+        else:
+            body = open(path, 'rb')
+            length = st.st_size
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(length))
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        if compressible:
+            self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.send_header('Cache-Control', cache_control)
+        self.end_headers()
+        return body
+
+    def not_modified(self, etag: str, st: os.stat_result) -> bool:
+        """Check the request's validators; If-None-Match takes precedence over If-Modified-Since."""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return since.tzinfo is not None and int(st.st_mtime) <= since.timestamp()
+        return False
+
+    def send_events(self):
+        """Stream a reload event to the page after every rebuild (server-sent events)."""
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        events = self.server.subscribe()
+        try:
+            while True:
+                try:
+                    events.get(timeout=KEEPALIVE_SECONDS)
+                    self.wfile.write(b'data: reload\n\n')
+                except queue.Empty:
+                    self.wfile.write(b': keepalive\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.server.unsubscribe(events)
+
+class PreviewServer(ThreadingHTTPServer):
+    """Threaded HTTP server for the site, with a registry of live reload listeners."""
+
+    daemon_threads = True
+
+    def __init__(self, address, root: str = '.', live_reload: bool = True):
+        self.root = os.path.abspath(root)
+        self.live_reload = live_reload
+        cache_name = 'gzip-livereload' if live_reload else 'gzip'
+        self.gzip_cache = GzipCache(self.root, os.path.join(self.root, CACHE_DIR, cache_name),
+                                    inject_live_reload if live_reload else None)
+        self.listeners: Set[queue.Queue] = set()
+        self.lock = threading.Lock()
+        super().__init__(address, partial(PreviewRequestHandler, directory=self.root))
+
+    def subscribe(self) -> queue.Queue:
+        """Register a live reload listener."""
+        events = queue.Queue()
+        with self.lock:
+            self.listeners.add(events)
+        return events
+
+    def unsubscribe(self, events: queue.Queue) -> None:
+        """Remove a live reload listener."""
+        with self.lock:
+            self.listeners.discard(events)
+
+    def notify_reload(self) -> int:
+        """
+        Tell every open page to reload.
+
+        Returns:
+            Number of pages notified
+        """
+        with self.lock:
+            for events in self.listeners:
+                events.put('reload')
+            return len(self.listeners)
@@ -0,0 +1,310 @@
+"""
+Persistent SQLite store of post metadata, so listing and filtering posts is a query
+"""
+
+import os
+import re
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from blog_cli.utils.frontmatter import extract_excerpt, parse_date, parse_post, read_post_header
+from blog_cli.utils.index import make_index_entry, post_tags
+from blog_cli.utils.manifest import CACHE_DIR, hash_bytes
+
+STORE_FILE = os.path.join(CACHE_DIR, 'posts.sqlite')
+
+# Bumping it rebuilds the store from scratch
+STORE_VERSION = 3
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT,
+    output TEXT,
+    filename TEXT NOT NULL,
+    sort_date TEXT NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS posts_order ON posts (sort_date DESC, filename);
+CREATE TABLE IF NOT EXISTS post_tags (
+    path TEXT NOT NULL REFERENCES posts (path) ON DELETE CASCADE,
+    tag TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (path, tag)
+);
+CREATE INDEX IF NOT EXISTS post_tags_tag ON post_tags (tag);
+'''
+
+# Full-text columns and their bm25 weights: a match in the title counts for
+# far more than one in code, and notebook output barely counts at all
+SEARCH_WEIGHTS = (
+    ('title', 10.0),
+    ('tags', 5.0),
+    ('prose', 1.0),
+    ('code', 0.5),
+    ('output', 0.2),
+)
+
+# Only created where SQLite was built with FTS5; search is unavailable otherwise.
+# A post's text has the rowid of its row in posts, and goes with it.
+SEARCH_SCHEMA = f'''
+CREATE VIRTUAL TABLE IF NOT EXISTS post_text USING fts5(
+    {', '.join(column for column, _ in SEARCH_WEIGHTS)}, tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS post_text_delete AFTER DELETE ON posts BEGIN
+    DELETE FROM post_text WHERE rowid = old.id;
+END;
+'''
+
+# Fenced blocks with a language are code; plain ones are (notebook) output
+FENCE_RE = re.compile(r'^(`{3,}|~{3,})[ \t]*([^\s`]*)[^\n]*\n(.*?)^\1[ \t]*$', re.MULTILINE | re.DOTALL)
+IMAGE_RE = re.compile(r'!\[([^\]]*)\]\([^)]*\)')
+LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+def sort_date(entry: Dict[str, Any]) -> str:
+    """Return the ISO date an index entry sorts by ('' for undated posts, which sort last)."""
+    date = parse_date(entry['date']) if entry['date'] else None
+    return date.isoformat() if date else ''
+
+def split_post_text(body: str) -> Tuple[str, str, str]:
+    """
+    Split a post's markdown into the text indexed for search.
+
+    Args:
+        body: The post content after the frontmatter
+
+    Returns:
+        Tuple of (prose, code, output), with images, link targets and HTML
+        tags dropped from the prose
+    """
+    code, output = [], []
+    def take(match):
+        (code if match.group(2) else output).append(match.group(3))
+        return '\n'
+    prose = FENCE_RE.sub(take, body)
+    prose = LINK_RE.sub(r'\1', IMAGE_RE.sub(r'\1', prose))
+    prose = HTML_TAG_RE.sub(' ', prose)
+    return prose, '\n'.join(code), '\n'.join(output)
+
+def fts_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query matching posts that contain every word.
+
+    Words are quoted so punctuation cannot break the query syntax; a word
+    ending in ``*`` matches as a prefix (``optim*``).
+
+    Args:
+        text: The user's query
+
+    Returns:
+        FTS5 query string ('' if there are no words)
+    """
+    return ' '.join(f'"{word}"{star}' for word, star in re.findall(r'(\w+)(\*?)', text))
+
+class PostStore:
+    """
+    Post metadata (the post-index.json entry, tags, content hash and output
+    path) keyed by source path, with the size and mtime it was read at.
+
+    The build keeps it current from its manifest; commands that only need
+    metadata call sync(), which stats every post and re-parses only the
+    ones whose size or mtime changed. Where SQLite has FTS5, each post's
+    title, tags, prose, code and output are also indexed for search().
+
+    A post synced for its metadata alone has only its frontmatter and excerpt
+    read, and is stored without a hash or search text; the next build, or
+    sync(search=True), reads it in full.
+    """
+
+    def __init__(self, path: str = STORE_FILE):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA foreign_keys = ON')
+        if self.db.execute('PRAGMA user_version').fetchone()[0] != STORE_VERSION:
+            with self.db:
+                self.db.execute('DROP TABLE IF EXISTS post_text')
+                self.db.execute('DROP TABLE IF EXISTS post_tags')
+                self.db.execute('DROP TABLE IF EXISTS posts')
+                self.db.execute(f'PRAGMA user_version = {STORE_VERSION}')
+        self.db.executescript(SCHEMA)
+        try:
+            self.db.executescript(SEARCH_SCHEMA)
+            self.searchable = True
+        except sqlite3.OperationalError:
+            self.searchable = False
+
+    def __enter__(self) -> 'PostStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database."""
+        self.db.close()
+
+    def _known(self) -> Dict[str, Tuple[int, int, Optional[str], Optional[str]]]:
+        """Return the recorded (size, mtime_ns, hash, output) of every post."""
+        rows = self.db.execute('SELECT path, size, mtime_ns, hash, output FROM posts')
+        return {path: (size, mtime_ns, digest, output) for path, size, mtime_ns, digest, output in rows}
+
+    def _put(self, path: str, size: int, mtime_ns: int, digest: Optional[str], output: Optional[str],
+             entry: Dict[str, Any], body: Optional[str]) -> None:
+        """Insert or replace one post, its tags and its search text (inside the caller's transaction)."""
+        self._remove([path])
+        cursor = self.db.execute(
+            'INSERT INTO posts (path, size, mtime_ns, hash, output, filename, sort_date, entry) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (path, size, mtime_ns, digest, output, entry['filename'], sort_date(entry), json.dumps(entry))
+        )
+        self.db.executemany('INSERT OR IGNORE INTO post_tags (path, tag) VALUES (?, ?)',
+                            [(path, tag) for tag in post_tags(entry)])
+        if self.searchable and body is not None:
+            self.db.execute(
+                'INSERT INTO post_text (rowid, title, tags, prose, code, output) VALUES (?, ?, ?, ?, ?, ?)',
+                (cursor.lastrowid, entry['title'], ' '.join(post_tags(entry))) + split_post_text(body)
+            )
+
+    def _remove(self, paths: Iterable[str]) -> None:
+        """Delete posts (inside the caller's transaction)."""
+        self.db.executemany('DELETE FROM posts WHERE path = ?', [(path,) for path in paths])
+
+    @staticmethod
+    def _read_body(path: str) -> Optional[str]:
+        """Return the body of a post source (None if it cannot be read)."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except OSError:
+            return None
+        return parse_post(content).body(content)
+
+    def merge(self, entries: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Bring the store in line with a build manifest.
+
+        Args:
+            entries: The manifest's entries, keyed by source path
+
+        Returns:
+            Number of posts added, updated or removed
+        """
+        known = self._known()
+        changed = 0
+        with self.db:
+            for path, entry in entries.items():
+                state = (entry['size'], entry['mtime_ns'], entry['hash'], entry['output'])
+                if known.pop(path, None) != state:
+                    # Only the posts this build rendered are read again, for the search text
+                    self._put(path, *state, entry['index'], self._read_body(path))
+                    changed += 1
+            self._remove(known)
+        return changed + len(known)
+
+    def sync(self, posts_dir: str = 'posts', search: bool = False) -> int:
+        """
+        Re-read the posts whose size or mtime changed since they were stored.
+
+        Only the frontmatter and first paragraph of a changed post are read
+        (see read_post_header), so listing a large archive costs the same
+        however long its posts are.
+
+        Args:
+            posts_dir: Directory of markdown posts
+            search: Also bring the search text up to date, reading changed
+                posts (and those stored from their header alone) in full
+
+        Returns:
+            Number of posts added, updated or removed
+        """
+        # Unchanged posts cost one stat and one dictionary lookup
+        known = {path: (size, mtime_ns, digest is not None) for path, size, mtime_ns, digest in
+                 self.db.execute('SELECT path, size, mtime_ns, hash FROM posts')}
+        changed = 0
+        with self.db:
+            for dir_entry in os.scandir(posts_dir):
+                if not dir_entry.name.endswith('.md') or not dir_entry.is_file():
+                    continue
+                path = os.path.join(posts_dir, dir_entry.name)
+                st = dir_entry.stat()
+                state = known.pop(path, None)
+                if state is not None and state[:2] == (st.st_size, st.st_mtime_ns) and (state[2] or not search):
+                    continue
+
+                base_filename = os.path.splitext(dir_entry.name)[0]
+                if not search:
+                    post, excerpt = read_post_header(path)
+                    self._put(path, st.st_size, st.st_mtime_ns, None, None,
+                              make_index_entry(post, base_filename, excerpt), None)
+                    changed += 1
+                    continue
+
+                with open(path, 'rb') as f:
+                    raw = f.read()
+                digest = hash_bytes(raw)
+                # The rendered output is still valid if only the mtime changed
+                row = self.db.execute('SELECT output FROM posts WHERE path = ? AND hash = ?', (path, digest)).fetchone()
+                output = row[0] if row else None
+                content = raw.decode('utf-8')
+                post = parse_post(content)
+                body = post.body(content)
+                entry = make_index_entry(post, base_filename, extract_excerpt(body))
+                self._put(path, st.st_size, st.st_mtime_ns, digest, output, entry, body)
+                changed += 1
+            self._remove(known)
+        return changed + len(known)
+
+    def posts(self, tag: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Return index entries, newest first (ties broken by filename).
+
+        Args:
+            tag: Only posts with this tag or category (case-insensitive)
+            limit: Maximum number of posts
+
+        Returns:
+            List of post-index.json entries
+        """
+        query = 'SELECT entry FROM posts'
+        params: List[Any] = []
+        if tag is not None:
+            query += ' WHERE path IN (SELECT path FROM post_tags WHERE tag = ?)'
+            params.append(tag)
+        query += ' ORDER BY sort_date DESC, filename'
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+        return [json.loads(entry) for entry, in self.db.execute(query, params)]
+
+    def search(self, query: str, limit: int = 10,
+               marks: Tuple[str, str] = ('[', ']')) -> List[Tuple[Dict[str, Any], str]]:
+        """
+        Find the posts matching every word of a query, best match first.
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of results
+            marks: Text placed before and after each match in the snippets
+
+        Returns:
+            List of (index entry, snippet) tuples; empty if the query has no
+            words or search is unavailable
+        """
+        match = fts_query(query)
+        if not self.searchable or not match:
+            return []
+        weights = ', '.join(str(weight) for _, weight in SEARCH_WEIGHTS)
+        rows = self.db.execute(
+            "SELECT posts.entry, snippet(post_text, -1, ?, ?, '...', 16) FROM post_text "
+            'JOIN posts ON posts.id = post_text.rowid '
+            f'WHERE post_text MATCH ? ORDER BY bm25(post_text, {weights}) LIMIT ?',
+            (marks[0], marks[1], match, limit)
+        )
+        return [(json.loads(entry), ' '.join(snippet.split())) for entry, snippet in rows]
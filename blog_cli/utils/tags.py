@@ -0,0 +1,125 @@
+"""
+Utility functions for writing the static tag listing pages and feeds
+"""
+
+import os
+import json
+import shutil
+from html import escape
+from typing import Any, Callable, Dict, List
+
+from blog_cli.utils.feed import FEED_SIZE, FEED_TITLE, SITE_URL, post_item, write_feed
+from blog_cli.utils.includes import ComponentCache, expand_includes
+from blog_cli.utils.index import post_tags
+from blog_cli.utils.manifest import BuildManifest, hash_bytes, write_if_changed
+from blog_cli.utils.pages import TAG_PAGES_DIR
+from blog_cli.utils.templates import Template, compile_template
+
+TAG_TEMPLATE = 'templates/tag.html'
+
+def render_post_list(posts: List[Dict[str, Any]]) -> str:
+    """
+    Render the <li> items of a tag page.
+
+    Args:
+        posts: Index entries of the tag's posts, newest first
+
+    Returns:
+        HTML string
+    """
+    return '\n'.join(
+        f'            <li class="post-item">\n'
+        f'                <h3 class="post-title"><a href="/{escape(post["url"])}">{escape(post["title"])}</a></h3>\n'
+        f'                <div class="post-date">{escape(post["date"])}</div>\n'
+        f'                <p class="post-excerpt">{escape(post["excerpt"])}</p>\n'
+        f'            </li>'
+        for post in posts
+    )
+
+def render_tag_page(template: Template, tag: str, posts: List[Dict[str, Any]]) -> str:
+    """
+    Render the listing page of a tag.
+
+    Args:
+        template: templates/tag.html with components inlined, compiled
+        tag: The tag or category
+        posts: Index entries of the tag's posts, newest first
+
+    Returns:
+        HTML of the page
+    """
+    return template.render({
+        'tag': escape(tag),
+        'count': f"{len(posts)} post{'s' if len(posts) != 1 else ''}",
+        'posts': render_post_list(posts),
+    })
+
+def write_tag_pages(posts: List[Dict[str, Any]], slugs: Dict[str, str], manifest: BuildManifest,
+                    components: ComponentCache, force: bool = False,
+                    echo: Callable[[str], Any] = print) -> List[str]:
+    """
+    Write a listing page and a feed for every tag and category.
+
+    Each tag's page is tags/<slug>/index.html and its feed, holding the
+    tag's newest posts, is tags/<slug>/rss.xml. The manifest records a hash
+    of everything a tag's files are made from (its posts' index entries, the
+    template and the components), so only tags whose posts changed, or that
+    were added to or removed from a post, are rendered again. Directories of
+    tags that are no longer used are removed.
+
+    Args:
+        posts: Index entries, already sorted newest first
+        slugs: Mapping of tag to slug (see tag_slugs)
+        manifest: The build manifest
+        components: Component cache for this build
+        force: Rewrite every tag's files
+        echo: Function used to report progress
+
+    Returns:
+        Slugs of the tags whose files were written or removed
+    """
+    by_tag: Dict[str, List[Dict[str, Any]]] = {}
+    for post in posts:
+        for tag in post_tags(post):
+            by_tag.setdefault(tag, []).append(post)
+
+    template = ''
+    if by_tag:
+        with open(TAG_TEMPLATE, 'r', encoding='utf-8') as f:
+            template, _ = expand_includes(f.read(), f"{TAG_PAGES_DIR}/tag/index.html", components)
+    options = hash_bytes(json.dumps([template, FEED_SIZE, FEED_TITLE, SITE_URL]).encode('utf-8'))
+    compiled = compile_template(template)
+
+    recorded: Dict[str, str] = manifest.meta.get('tag_pages', {})
+    current: Dict[str, str] = {}
+    changed = []
+    for tag, tag_posts in sorted(by_tag.items()):
+        slug = slugs[tag]
+        directory = os.path.join(TAG_PAGES_DIR, slug)
+        page_path = os.path.join(directory, 'index.html')
+        feed_path = os.path.join(directory, 'rss.xml')
+        digest = hash_bytes(json.dumps([tag, tag_posts, options]).encode('utf-8'))
+        current[slug] = digest
+        if not force and recorded.get(slug) == digest and os.path.exists(page_path) \
+                and os.path.exists(feed_path):
+            continue
+
+        os.makedirs(directory, exist_ok=True)
+        wrote = write_if_changed(page_path, render_tag_page(compiled, tag, tag_posts))
+        items = (post_item(post) for post in tag_posts[:FEED_SIZE])
+        feed_url = f"{SITE_URL}/{TAG_PAGES_DIR}/{slug}/rss.xml"
+        wrote = write_feed(feed_path, items, title=f"{FEED_TITLE}: {tag}", self_url=feed_url) or wrote
+        if wrote:
+            echo(f"Generated {page_path}")
+            changed.append(slug)
+
+    # Remove the pages of tags no post uses any more
+    for slug in sorted(set(recorded) - set(current)):
+        directory = os.path.join(TAG_PAGES_DIR, slug)
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+            echo(f"Removed {directory}")
+            changed.append(slug)
+
+    manifest.set_meta('tag_pages', current)
+    return changed
@@ -3,7 +3,93 @@ Utility functions for template handling
 """
 
 import os
+import re
 from datetime import datetime
+from typing import Dict, Iterator, List, TextIO, Tuple
+
+from blog_cli.utils.manifest import hash_bytes
+
+# Page template shipped with the package, used by `page create`
+PAGE_TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates', 'page.html')
+
+PLACEHOLDER_RE = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+# Compiled templates are kept by content hash; a build only uses a handful
+MAX_COMPILED = 32
+
+class Template:
+    """
+    A template split once into literal chunks and {{ name }} placeholders.
+
+    Rendering only joins the chunks with the values, so a template is parsed
+    once however many pages are rendered from it. Text inserted for one
+    placeholder is never scanned again, and unknown placeholders are kept.
+    """
+
+    def __init__(self, source: str):
+        # (literal text, placeholder name, placeholder as written), then the trailing text
+        self.parts: List[Tuple[str, str, str]] = []
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(source):
+            self.parts.append((source[position:match.start()], match.group(1), match.group(0)))
+            position = match.end()
+        self.tail = source[position:]
+
+    def chunks(self, values: Dict[str, str]) -> Iterator[str]:
+        """
+        Yield the rendered template piece by piece.
+
+        Args:
+            values: Text to insert for each placeholder name
+
+        Returns:
+            Iterator of strings
+        """
+        for literal, name, placeholder in self.parts:
+            yield literal
+            yield values.get(name, placeholder)
+        yield self.tail
+
+    def render(self, values: Dict[str, str]) -> str:
+        """Render the template to a string."""
+        return ''.join(self.chunks(values))
+
+    def stream(self, f: TextIO, values: Dict[str, str]) -> None:
+        """Write the rendered template to a file without building the page in memory."""
+        f.writelines(self.chunks(values))
+
+_compiled: Dict[str, Template] = {}
+
+def compile_template(source: str) -> Template:
+    """
+    Compile a template, reusing the compiled form of identical source.
+
+    Args:
+        source: The template text
+
+    Returns:
+        Template instance
+    """
+    key = hash_bytes(source.encode('utf-8'))
+    template = _compiled.get(key)
+    if template is None:
+        if len(_compiled) >= MAX_COMPILED:
+            _compiled.clear()
+        template = _compiled[key] = Template(source)
+    return template
+
+def load_template(path: str) -> Template:
+    """
+    Load and compile a template file; an edited file is compiled again.
+
+    Args:
+        path: Path to the template
+
+    Returns:
+        Template instance
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return compile_template(f.read())
 
 def get_page_template(title, description, in_subdirectory=False):
     """
@@ -17,106 +103,14 @@ def get_page_template(title, description, in_subdirectory=False):
     Returns:
         HTML template string
     """
-    # Define the paths
-    component_path = "../components/" if in_subdirectory else "components/"
-    js_path = "../js/" if in_subdirectory else "js/"
-    
-    return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title} | Kyle Jackson</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, 'Open Sans', 'Helvetica Neue', sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 2rem 1rem;
-            background-color: #fafafa;
-        }}
-        header {{
-            margin-bottom: 2rem;
-        }}
-        nav {{
-            display: flex;
-            gap: 1rem;
-            margin-top: 1rem;
-        }}
-        nav a {{
-            text-decoration: none;
-            color: #0366d6;
-            font-weight: 500;
-        }}
-        nav a:hover {{
-            text-decoration: underline;
-        }}
-        main {{
-            margin-bottom: 2rem;
-        }}
-        h1 {{
-            font-size: 2.5rem;
-            margin-bottom: 0.5rem;
-            color: #1a1a1a;
-        }}
-        h2 {{
-            font-size: 1.8rem;
-            margin: 1.5rem 0 1rem;
-            color: #333;
-            border-bottom: 1px solid #eee;
-            padding-bottom: 0.5rem;
-        }}
-        p {{
-            margin-bottom: 1rem;
-            font-size: 1.1rem;
-        }}
-        section {{
-            margin-bottom: 2.5rem;
-        }}
-        footer {{
-            margin-top: 3rem;
-            padding-top: 1rem;
-            border-top: 1px solid #eee;
-            color: #666;
-            font-size: 0.9rem;
-        }}
-        .social-links {{
-            margin-top: 0.5rem;
-            display: flex;
-            align-items: center;
-        }}
-    </style>
-    <!-- Include the component loader script -->
-    <script src="{js_path}include.js"></script>
-</head>
-<body>
-    <!-- Include the header component -->
-    <div data-include="{component_path}header.html"></div>
-
-    <main>
-        <h2>{title}</h2>
-        
-        <section>
-            <p>{description}</p>
-            
-            <!-- Your content goes here -->
-            <p>This is a new page created on {datetime.now().strftime('%Y-%m-%d')}.</p>
-            <p>Replace this placeholder content with your actual content.</p>
-        </section>
-    </main>
-
-    <!-- Include the footer component -->
-    <div data-include="{component_path}footer.html"></div>
-</body>
-</html>
-"""
+    prefix = "../" if in_subdirectory else ""
+    return load_template(PAGE_TEMPLATE).render({
+        'title': title,
+        'description': description,
+        'date': datetime.now().strftime('%Y-%m-%d'),
+        'component_path': f"{prefix}components/",
+        'js_path': f"{prefix}js/",
+    })
 
 def get_post_template(title, date=None):
     """
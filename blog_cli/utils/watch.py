@@ -0,0 +1,177 @@
+"""
+Utility functions for watching source directories and rebuilding on change
+"""
+
+import os
+import time
+import ctypes
+import ctypes.util
+import select
+import struct
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Directories whose contents affect the build
+WATCH_DIRS = ('posts', 'posts/images', 'templates', 'components')
+
+# Saves often arrive as a burst of events (write, rename, attribute change);
+# a rebuild starts once no event has been seen for this long
+DEBOUNCE_SECONDS = 0.05
+POLL_INTERVAL = 0.2
+
+# inotify constants from <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ATTRIB
+EVENT_HEADER = struct.Struct('iIII')
+
+def is_ignored(name: str) -> bool:
+    """Check whether a filename is an editor swap/backup file rather than content."""
+    return name.startswith(('.', '#')) or name.endswith(('~', '.swp', '.swx', '.tmp'))
+
+class InotifyWatcher:
+    """Watches directories with Linux inotify, called through ctypes."""
+
+    def __init__(self, dirs: Iterable[str]):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        # Raises AttributeError on platforms without inotify
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+        self.dirs: Dict[int, str] = {}
+        for directory in dirs:
+            if not os.path.isdir(directory):
+                continue
+            wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f'Cannot watch {directory}')
+            self.dirs[wd] = directory
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """
+        Wait for changes.
+
+        Args:
+            timeout: Seconds to wait, or None to wait indefinitely
+
+        Returns:
+            Paths that changed (empty if the timeout expired)
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset + EVENT_HEADER.size <= len(data):
+                wd, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'replace')
+                offset += length
+                if wd in self.dirs and name and not is_ignored(name):
+                    changed.add(os.path.join(self.dirs[wd], name))
+        return changed
+
+    def close(self) -> None:
+        """Stop watching."""
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Watches directories by comparing the size and mtime of their files."""
+
+    def __init__(self, dirs: Iterable[str], interval: float = POLL_INTERVAL):
+        self.dirs = [directory for directory in dirs if os.path.isdir(directory)]
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for directory in self.dirs:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if is_ignored(entry.name) or not entry.is_file():
+                    continue
+                st = entry.stat()
+                snapshot[entry.path] = (st.st_size, st.st_mtime_ns)
+        return snapshot
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """
+        Wait for changes.
+
+        Args:
+            timeout: Seconds to wait, or None to wait indefinitely
+
+        Returns:
+            Paths that changed (empty if the timeout expired)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.interval if deadline is None else max(0, min(self.interval, deadline - time.monotonic())))
+            snapshot = self._scan()
+            changed = {
+                path for path in set(snapshot) | set(self.snapshot)
+                if snapshot.get(path) != self.snapshot.get(path)
+            }
+            self.snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        """Stop watching."""
+
+def make_watcher(dirs: Iterable[str]):
+    """
+    Create the best available watcher: inotify on Linux, polling elsewhere.
+
+    Args:
+        dirs: Directories to watch (not recursive)
+
+    Returns:
+        An InotifyWatcher or PollingWatcher
+    """
+    dirs = list(dirs)
+    try:
+        return InotifyWatcher(dirs)
+    except (OSError, AttributeError):
+        return PollingWatcher(dirs)
+
+def watch(dirs: Iterable[str], on_change: Callable[[List[str]], Any],
+          debounce: float = DEBOUNCE_SECONDS) -> None:
+    """
+    Call ``on_change`` after each burst of changes, until interrupted.
+
+    Args:
+        dirs: Directories to watch (not recursive)
+        on_change: Called with the sorted list of changed paths
+        debounce: Seconds without further events that end a burst
+    """
+    watcher = make_watcher(dirs)
+    try:
+        while True:
+            changed = watcher.wait()
+            while changed:
+                more = watcher.wait(debounce)
+                if not more:
+                    break
+                changed |= more
+            if changed:
+                on_change(sorted(changed))
+    finally:
+        watcher.close()
@@ -1,10 +1,12 @@
 /**
  * Simple component include system
- * Finds elements with data-include attribute and replaces them with the content of the referenced file
+ * Finds elements with data-include attribute and replaces them with the content of the referenced file.
+ * Elements already expanded by the build (data-included) are left alone, so this only fetches
+ * components for pages that have not been built.
  */
 document.addEventListener('DOMContentLoaded', function() {
-    // Find all elements with the data-include attribute
-    const includes = document.querySelectorAll('[data-include]');
+    // Find all elements with the data-include attribute that still need their content
+    const includes = document.querySelectorAll('[data-include]:not([data-included])');
     
     // Process each include
     includes.forEach(function(element) {
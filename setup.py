@@ -5,9 +5,17 @@ setup(
     version="0.1.0",
     packages=find_packages(),
     include_package_data=True,
+    # Templates rendered by blog-cli itself (e.g. `page create`)
+    package_data={"blog_cli": ["templates/*.html"]},
     install_requires=[
         "click>=8.0.0",
+        "markdown>=3.0",
+        "pygments>=2.7",
     ],
+    extras_require={
+        # Resized WebP copies of post images
+        "images": ["Pillow>=8.0"],
+    },
     entry_points={
         "console_scripts": [
             "blog-cli=blog_cli.cli:cli",
@@ -1,9 +1,10 @@
 #!/bin/bash
 # Setup script for the blog
 
-# Install required dependencies
+# Install required dependencies (with Pillow, for the WebP image copies the
+# committed pages refer to)
 echo "Installing required dependencies..."
-pip install markdown
+pip install -e ".[images]"
 
 # Generate post index
 echo "Generating post index..."
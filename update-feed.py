@@ -1,103 +1,77 @@
 #!/usr/bin/env python3
 
 """
-A script to update the RSS feed with existing posts.
+A script to add an external item (a paper, a talk) to the RSS feed.
 
 Usage:
     python update-feed.py "Post Title" --link URL [--description "Description"] [--date "YYYY-MM-DD"]
 
-This will add or update an entry in the RSS feed for an existing post.
+This adds or updates the item in feed-items.json, the hand-curated items that
+are merged with the posts, and regenerates rss.xml from post-index.json.
+Posts themselves do not need to be added: they come from the post index.
 """
 
 import os
 import sys
+import json
 import argparse
 from datetime import datetime
-import xml.etree.ElementTree as ET
 
-def update_rss_feed(title, link, description, pub_date=None):
-    """Update the RSS feed with a post."""
-    rss_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rss.xml')
-    
-    # Parse the existing RSS feed
-    tree = ET.parse(rss_path)
-    root = tree.getroot()
-    channel = root.find('channel')
-    
-    # Check if item with this link already exists
-    existing_item = None
-    for item in channel.findall('item'):
-        if item.find('link').text == link:
-            existing_item = item
-            break
+from blog_cli.utils.feed import EXTERNAL_ITEMS_FILE, build_feed, load_external_items
+from blog_cli.utils.index import INDEX_FILE
+
+def update_rss_feed(title, link, description, date):
+    """Add or update an external item, then regenerate the feed."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    items_path = os.path.join(root, EXTERNAL_ITEMS_FILE)
     
-    if existing_item is not None:
-        # Update existing item
-        existing_item.find('title').text = title
-        existing_item.find('description').text = description
-        if pub_date:
-            existing_item.find('pubDate').text = pub_date
+    # Items are keyed by link, so updating one does not depend on how many there are
+    items = {item['link']: item for item in load_external_items(items_path)}
+    if link in items:
         print(f"Updated existing RSS feed entry: {title}")
     else:
-        # Create new item
-        item = ET.SubElement(channel, 'item')
-        
-        # Add item elements
-        title_elem = ET.SubElement(item, 'title')
-        title_elem.text = title
-        
-        link_elem = ET.SubElement(item, 'link')
-        link_elem.text = link
-        
-        desc_elem = ET.SubElement(item, 'description')
-        desc_elem.text = description
-        
-        # Add publication date
-        if not pub_date:
-            pub_date = datetime.now().strftime('%a, %d %b %Y %H:%M:%S GMT')
-        pub_date_elem = ET.SubElement(item, 'pubDate')
-        pub_date_elem.text = pub_date
-        
-        # Add GUID
-        guid_elem = ET.SubElement(item, 'guid')
-        guid_elem.text = link
-        
         print(f"Added new RSS feed entry: {title}")
+    items[link] = {'title': title, 'link': link, 'description': description,
+                   'date': date or items.get(link, {}).get('date') or datetime.now().strftime('%Y-%m-%d')}
     
-    # Update lastBuildDate
-    last_build_date = channel.find('lastBuildDate')
-    if last_build_date is not None:
-        last_build_date.text = datetime.now().strftime('%a, %d %b %Y %H:%M:%S GMT')
+    with open(items_path, 'w', encoding='utf-8') as f:
+        json.dump(list(items.values()), f, indent=2)
+        f.write('\n')
     
-    # Write the updated RSS feed
-    tree.write(rss_path, encoding='UTF-8', xml_declaration=True)
+    index_path = os.path.join(root, INDEX_FILE)
+    posts = []
+    if os.path.exists(index_path):
+        with open(index_path, 'r', encoding='utf-8') as f:
+            posts = json.load(f)
+    build_feed(posts, feed_path=os.path.join(root, 'rss.xml'),
+               archive_path=os.path.join(root, 'rss-archive.xml'), external_path=items_path)
 
 def parse_date(date_str):
-    """Parse date string in YYYY-MM-DD format to RSS date format."""
+    """Check a date string is in YYYY-MM-DD format."""
     try:
-        date = datetime.strptime(date_str, '%Y-%m-%d')
-        return date.strftime('%a, %d %b %Y %H:%M:%S GMT')
+        datetime.strptime(date_str, '%Y-%m-%d')
+        return date_str
     except ValueError:
         print(f"Error: Invalid date format. Please use YYYY-MM-DD")
         sys.exit(1)
 
 def main():
     # Setup argument parser
-    parser = argparse.ArgumentParser(description='Update RSS feed with existing post')
-    parser.add_argument('title', help='The title of the post')
-    parser.add_argument('--link', required=True, help='URL for the post')
+    parser = argparse.ArgumentParser(description='Add an external item to the RSS feed')
+    parser.add_argument('title', help='The title of the item')
+    parser.add_argument('--link', required=True, help='URL of the item')
     parser.add_argument('--description', help='Description for the RSS feed', default='')
     parser.add_argument('--date', help='Publication date in YYYY-MM-DD format', default='')
     args = parser.parse_args()
     
     # Parse date if provided
-    pub_date = parse_date(args.date) if args.date else None
+    date = parse_date(args.date) if args.date else None
     
     # If no description provided, use a default one
     description = args.description or f"Post: {args.title}"
     
     # Update the RSS feed
-    update_rss_feed(args.title, args.link, description, pub_date)
+    update_rss_feed(args.title, args.link, description, date)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()